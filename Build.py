@@ -4,91 +4,294 @@
 Использование:
     python build.py
 
+    python build.py --fresh   # полная пересборка с очисткой кэша PyInstaller
+                              # (нужно только при смене версии Python или хуков)
+
+При первой сборке генерируется CyberLauncher.spec - дальше PyInstaller
+запускается по нему и переиспользует кэшированный Analysis вместо
+повторного разбора аргументов командной строки.
+
 Требования:
     pip install pyinstaller
 
 После сборки .exe будет в папке dist/
 """
 
+import argparse
+import hashlib
+import importlib.util
+import json
+import shutil
 import subprocess
 import sys
 import os
 
-def build():
-    # Проверяем PyInstaller
+# Параметры сборки
+APP_NAME = "CyberLauncher"
+MAIN_FILE = "main.py"
+ICON_FILE = "icon.ico"
+SPEC_FILE = f"{APP_NAME}.spec"
+
+# Папка скрипта вычисляется один раз на импорт - build() и хэш-гейт
+# используют её вместо повторных os.path.abspath вызовов
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Дополнительные файлы для включения
+ADD_DATA = [
+    ("game_manager.py", "."),  # Копируем game_manager.py
+    (ICON_FILE, "."),          # Копируем иконку
+]
+
+# Скрытые импорты (модули которые PyInstaller может не найти)
+# Только реально используемые подмодули: бланкетный "PIL" тянул
+# в Analysis весь граф Pillow, включая неиспользуемые бэкенды
+HIDDEN_IMPORTS = [
+    "win32gui",
+    "win32ui",
+    "win32con",
+    "win32api",
+    "pefile",
+    "PIL.Image",
+    "flet",
+    "flet_desktop",
+    "icoextract",
+    "duckduckgo_search",
+    "curl_cffi",
+    "primp",
+    "pystray",
+    "pystray._win32",
+]
+
+# Модули, которые точно не нужны в бандле - меньше работы для
+# modulegraph и меньше PYZ. tkinter и email исключать нельзя:
+# tkinter используется для диалогов выбора файлов в main.py,
+# email нужен urllib.request
+EXCLUDES = [
+    "unittest",
+    "pydoc",
+    "test",
+    "xmlrpc",
+    "http.server",
+    "PIL.ImageQt",
+    "PIL.ImageTk",
+    "PIL.ImageShow",
+]
+
+
+# UPX ломает некоторые системные DLL - исключаем их из сжатия
+UPX_EXCLUDE = ["vcruntime140.dll", "python3*.dll"]
+
+
+def generate_spec(spec_path: str, onefile: bool = False, upx: bool = False):
+    """Генерирует .spec файл, чтобы PyInstaller кэшировал Analysis.
+
+    Все аргументы сборки живут в spec-файле, а не в командной строке:
+    команда запуска остаётся короткой и одинаковой между запусками.
+    """
+    header = f"""# -*- mode: python ; coding: utf-8 -*-
+# Сгенерировано Build.py - правки сюда, а не в аргументы командной строки
+
+a = Analysis(
+    [{MAIN_FILE!r}],
+    datas={ADD_DATA!r},
+    hiddenimports={HIDDEN_IMPORTS!r},
+    excludes={EXCLUDES!r},
+    optimize=2,
+)
+pyz = PYZ(a.pure)
+"""
+    if onefile:
+        body = f"""
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    name={APP_NAME!r},
+    console=False,
+    icon={ICON_FILE!r},
+    upx={upx!r},
+    upx_exclude={UPX_EXCLUDE!r},
+)
+"""
+    else:
+        # upx=False: UPX-сжатие DLL - самый медленный шаг сборки и даёт
+        # только размер; для итеративных dev-сборок оно не нужно
+        body = f"""
+exe = EXE(
+    pyz,
+    a.scripts,
+    exclude_binaries=True,
+    name={APP_NAME!r},
+    console=False,
+    icon={ICON_FILE!r},
+    upx={upx!r},
+    upx_exclude={UPX_EXCLUDE!r},
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    name={APP_NAME!r},
+    upx={upx!r},
+    upx_exclude={UPX_EXCLUDE!r},
+)
+"""
+    with open(spec_path, "w", encoding="utf-8") as f:
+        f.write(header + body)
+    print(f"[OK] Spec file generated: {spec_path}")
+
+
+def _inputs_hash(spec_name: str, cmd: list) -> str:
+    """Хэш всех входов сборки: исходники + иконка + spec + команда"""
+    # blake2b быстрый и есть в stdlib - лишних импортов не нужно
+    h = hashlib.blake2b(digest_size=16)
+    for name in (MAIN_FILE, "game_manager.py", ICON_FILE, spec_name):
+        path = os.path.join(SCRIPT_DIR, name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    h.update(json.dumps([ADD_DATA, HIDDEN_IMPORTS, EXCLUDES, cmd[2:]],
+                        sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _prune_artifact_cache(cache_dir: str, keep: int = 10):
+    """Оставляет в кэше артефактов только N самых свежих exe"""
     try:
-        import PyInstaller
-        print("[OK] PyInstaller found")
-    except ImportError:
+        cached = sorted(
+            (os.path.join(cache_dir, n) for n in os.listdir(cache_dir)
+             if n.endswith(".exe")),
+            key=os.path.getmtime, reverse=True)
+        for stale in cached[keep:]:
+            os.unlink(stale)
+    except OSError:
+        pass
+
+
+def build():
+    parser = argparse.ArgumentParser(description="Сборка CyberLauncher")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Очистить кэш PyInstaller перед сборкой (--clean)")
+    parser.add_argument("--onefile", action="store_true",
+                        help="Собрать один .exe (медленный запуск, для распространения)")
+    parser.add_argument("--release", action="store_true",
+                        help="Релизная сборка: включить UPX-сжатие бинарников")
+    args = parser.parse_args()
+    # Проверяем PyInstaller. find_spec только резолвит загрузчик,
+    # не исполняя __init__ пакета - реальная работа всё равно идёт
+    # в дочернем python -m PyInstaller
+    if importlib.util.find_spec("PyInstaller") is None:
         print("Installing PyInstaller...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"])
-    
-    # Параметры сборки
-    app_name = "CyberLauncher"
-    main_file = "main.py"
-    icon_file = "icon.ico"
-    
-    # Дополнительные файлы для включения
-    add_data = [
-        f"game_manager.py;.",  # Копируем game_manager.py
-        f"{icon_file};.",      # Копируем иконку
-    ]
-    
-    # Скрытые импорты (модули которые PyInstaller может не найти)
-    hidden_imports = [
-        "win32gui",
-        "win32ui",
-        "win32con",
-        "win32api",
-        "pefile",
-        "PIL",
-        "PIL.Image",
-        "flet",
-        "flet_desktop",
-        "icoextract",
-        "duckduckgo_search",
-        "curl_cffi",
-        "primp",
-        "pystray",
-        "pystray._win32",
-    ]
-    
-    # Формируем команду
-    cmd = [
-        sys.executable, "-m", "PyInstaller",
-        "--name", app_name,
-        "--onefile",           # Один exe файл
-        "--windowed",          # Без консоли (GUI приложение)
-        "--icon", icon_file,   # Иконка exe
-        "--clean",             # Очистить кэш перед сборкой
-        "--noconfirm",         # Не спрашивать подтверждение
-    ]
-    
-    # Добавляем данные
-    for data in add_data:
-        cmd.extend(["--add-data", data])
-    
-    # Добавляем скрытые импорты
-    for imp in hidden_imports:
-        cmd.extend(["--hidden-import", imp])
-    
-    # Добавляем главный файл
-    cmd.append(main_file)
-    
-    print(f"\nЗапускаю сборку: {app_name}")
+        # --prefer-binary: ставим wheel вместо сборки из sdist;
+        # --disable-pip-version-check: без лишнего запроса к PyPI.
+        # --no-deps не используем - PyInstaller'у нужны altgraph/pefile
+        subprocess.run([sys.executable, "-m", "pip", "install",
+                        "--prefer-binary", "--disable-pip-version-check",
+                        "pyinstaller"],
+                       check=True)
+    else:
+        print("[OK] PyInstaller found")
+
+    # Все сборки идут через .spec файл: команда запуска короткая и
+    # стабильная (длинный список --add-data/--hidden-import упирался бы
+    # в лимит командной строки Windows по мере роста проекта), а
+    # PyInstaller переиспользует сериализованный Analysis
+    if args.onefile:
+        # Onefile-spec зависит от --release, поэтому перегенерируем всегда
+        spec_name = f"{APP_NAME}-onefile.spec"
+        generate_spec(os.path.join(SCRIPT_DIR, spec_name),
+                      onefile=True, upx=args.release)
+    else:
+        spec_name = SPEC_FILE
+        spec_path = os.path.join(SCRIPT_DIR, spec_name)
+        if not os.path.exists(spec_path):
+            generate_spec(spec_path)
+    cmd = [sys.executable, "-m", "PyInstaller", "--noconfirm", spec_name]
+
+    # --clean сбрасывает кэш Analysis/pyc PyInstaller'а, поэтому
+    # включаем его только по запросу - иначе повторные сборки
+    # переиспользуют кэш и пропускают фазу анализа
+    if args.fresh:
+        cmd.append("--clean")
+
+    # Кэш-гейт: если входы не менялись с прошлой успешной сборки
+    # и exe на месте - не запускаем PyInstaller вообще
+    if args.onefile:
+        target_exe = os.path.join(SCRIPT_DIR, "dist", f"{APP_NAME}.exe")
+    else:
+        target_exe = os.path.join(SCRIPT_DIR, "dist", APP_NAME, f"{APP_NAME}.exe")
+
+    cache_dir = os.path.join(SCRIPT_DIR, ".build_cache")
+    hash_file = os.path.join(cache_dir, "last_hash")
+    inputs_hash = _inputs_hash(spec_name, cmd)
+
+    if not args.fresh and os.path.exists(target_exe) and os.path.exists(hash_file):
+        with open(hash_file, "r", encoding="utf-8") as f:
+            if f.read().strip() == inputs_hash:
+                print(f"[OK] Inputs unchanged, build is up to date: {target_exe}")
+                return
+
+    # Контентно-адресуемый кэш готовых exe (onefile): если такой набор
+    # входов уже собирался на этой машине - копируем артефакт вместо
+    # полной пересборки. Для onedir не применяется: там артефакт -
+    # целая папка, а инкрементальность даёт кэш самого PyInstaller'а
+    cached_exe = os.path.join(cache_dir, f"{inputs_hash}.exe")
+    if args.onefile and not args.fresh and os.path.exists(cached_exe):
+        os.makedirs(os.path.dirname(target_exe), exist_ok=True)
+        shutil.copyfile(cached_exe, target_exe)
+        print(f"[OK] Restored from build cache: {target_exe}")
+        return
+
+    print(f"\nЗапускаю сборку: {APP_NAME}")
     print("=" * 50)
-    
-    # Запускаем сборку
-    result = subprocess.run(cmd, cwd=os.path.dirname(os.path.abspath(__file__)))
-    
-    if result.returncode == 0:
+
+    # Прогреваем __pycache__ локальных модулей: свежие .pyc совпадают
+    # с localpycs-кэшем PyInstaller'а, и Analysis не перекомпилирует их
+    subprocess.run([sys.executable, "-m", "compileall", "-q", "-j", "0",
+                    os.path.join(SCRIPT_DIR, MAIN_FILE),
+                    os.path.join(SCRIPT_DIR, "game_manager.py")])
+
+    # Локальный bincache вместо общего %LOCALAPPDATA%\pyinstaller:
+    # кэш не сбрасывается другими проектами и параллельными сборками
+    env = os.environ.copy()
+    env["PYINSTALLER_CONFIG_DIR"] = os.path.join(SCRIPT_DIR, ".pyinstaller-cache")
+    os.makedirs(env["PYINSTALLER_CONFIG_DIR"], exist_ok=True)
+
+    # Запускаем сборку, транслируя вывод PyInstaller построчно -
+    # фаза Analysis может молчать десятки секунд, и без стриминга
+    # сборка выглядит зависшей
+    process = subprocess.Popen(
+        cmd, cwd=SCRIPT_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1,
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+    for line in process.stdout:
+        sys.stdout.write(line)
+    returncode = process.wait()
+
+    if returncode == 0:
+        # Хэш записываем только после успешной сборки
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(hash_file, "w", encoding="utf-8") as f:
+            f.write(inputs_hash)
+
+        # Складываем onefile-артефакт в кэш для будущих сборок
+        if args.onefile and os.path.exists(target_exe):
+            shutil.copyfile(target_exe, cached_exe)
+            _prune_artifact_cache(cache_dir)
+
         print("\n" + "=" * 50)
         print(f"[OK] Build completed successfully!")
-        print(f"[OK] File: dist/{app_name}.exe")
+        if args.onefile:
+            print(f"[OK] File: dist/{APP_NAME}.exe")
+        else:
+            print(f"[OK] File: dist/{APP_NAME}/{APP_NAME}.exe")
         print("=" * 50)
     else:
         print("\n[ERROR] Build failed!")
         sys.exit(1)
 
 if __name__ == "__main__":
-    build()
\ No newline at end of file
+    build()
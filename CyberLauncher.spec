@@ -1,39 +1,30 @@
 # -*- mode: python ; coding: utf-8 -*-
-
+# Сгенерировано Build.py - правки сюда, а не в аргументы командной строки
 
 a = Analysis(
     ['main.py'],
-    pathex=[],
-    binaries=[],
     datas=[('game_manager.py', '.'), ('icon.ico', '.')],
-    hiddenimports=['win32gui', 'win32ui', 'win32con', 'win32api', 'pefile', 'PIL', 'PIL.Image', 'flet', 'flet_desktop', 'icoextract', 'duckduckgo_search', 'curl_cffi', 'primp', 'pystray', 'pystray._win32'],
-    hookspath=[],
-    hooksconfig={},
-    runtime_hooks=[],
-    excludes=[],
-    noarchive=False,
-    optimize=0,
+    hiddenimports=['win32gui', 'win32ui', 'win32con', 'win32api', 'pefile', 'PIL.Image', 'flet', 'flet_desktop', 'icoextract', 'duckduckgo_search', 'curl_cffi', 'primp', 'pystray', 'pystray._win32'],
+    excludes=['unittest', 'pydoc', 'test', 'xmlrpc', 'http.server', 'PIL.ImageQt', 'PIL.ImageTk', 'PIL.ImageShow'],
+    optimize=2,
 )
 pyz = PYZ(a.pure)
 
 exe = EXE(
     pyz,
     a.scripts,
+    exclude_binaries=True,
+    name='CyberLauncher',
+    console=False,
+    icon='icon.ico',
+    upx=False,
+    upx_exclude=['vcruntime140.dll', 'python3*.dll'],
+)
+coll = COLLECT(
+    exe,
     a.binaries,
     a.datas,
-    [],
     name='CyberLauncher',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=False,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-    icon=['icon.ico'],
+    upx=False,
+    upx_exclude=['vcruntime140.dll', 'python3*.dll'],
 )
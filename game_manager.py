@@ -7,24 +7,31 @@ VERSION 6.0 (ANTI-BAN & NEW API)
 - Расширен список CDN ссылок Steam для повышения шансов найти обложку.
 """
 
+import io
 import os
 import re
 import json
 import asyncio
+import functools
 import hashlib
+import importlib.util
 import logging
+import mmap
+import shutil
+import sqlite3
 import subprocess
 import urllib.request
 import urllib.parse
+import threading
 import time  # <--- Добавлено для пауз
 import random # <--- Для случайных пауз
+from collections import OrderedDict
 from pathlib import Path
 from dataclasses import dataclass, field, asdict
 from typing import Optional, List, Dict, Any, Tuple
 from enum import Enum
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Windows-specific imports
 import winreg
@@ -41,26 +48,455 @@ logging.basicConfig(
 )
 logger = logging.getLogger("GameManager")
 
+# Тяжёлые необязательные зависимости не импортируем на старте:
+# duckduckgo_search тянет httpx/lxml и стоит сотен мс холодного
+# запуска. Наличие проверяем по метаданным пакета (find_spec не
+# исполняет __init__), сам импорт происходит при первом использовании
+# и дальше берётся из sys.modules бесплатно
+HAS_DDG = importlib.util.find_spec("duckduckgo_search") is not None
+if HAS_DDG:
+    logger.info("DuckDuckGo search library available")
+else:
+    logger.warning("DuckDuckGo search not available")
+
+HAS_ICOEXTRACT = importlib.util.find_spec("icoextract") is not None
+
+# requests даёт keep-alive и пул соединений: повторные запросы к одному
+# хосту (Steam CDN, SGDB) не платят TLS-рукопожатие заново
 try:
-    import win32com.client
-except ImportError as e:
-    logger.error(f"Failed to import win32com: {e}")
+    import requests
+    from requests.adapters import HTTPAdapter
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+    logger.warning("requests not available, falling back to urllib (no connection pooling)")
 
-# Попытка импорта новой библиотеки
+# orjson (Rust) парсит JSON в разы быстрее stdlib - заметно на
+# многомегабайтных grids-ответах SGDB и на library.json. Библиотека
+# необязательна: без неё работаем на json из stdlib
 try:
-    from duckduckgo_search import DDGS
-    HAS_DDG = True
-    logger.info("DuckDuckGo search library loaded successfully")
-except ImportError as e:
-    HAS_DDG = False
-    logger.warning(f"DuckDuckGo search not available: {e}")
+    import orjson
+
+    def _jloads(data):
+        return orjson.loads(data)
+
+    def _jdumps(obj, indent: bool = False) -> str:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+    def _jdumpb(obj, indent: bool = False) -> bytes:
+        # Для файлов, открытых в бинарном режиме: без decode/encode
+        # round-trip поверх нативного вывода orjson
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+    def _jloads(data):
+        return json.loads(data)
+
+    def _jdumps(obj, indent: bool = False) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
 
+    def _jdumpb(obj, indent: bool = False) -> bytes:
+        return _jdumps(obj, indent).encode('utf-8')
+
+# msgspec конструирует типизированные объекты из распарсенного JSON на
+# уровне C - быстрее, чем from_dict по каждой игре. Тоже необязательна
 try:
-    import icoextract
-    HAS_ICOEXTRACT = True
+    import msgspec
+    HAS_MSGSPEC = True
 except ImportError:
-    HAS_ICOEXTRACT = False
+    HAS_MSGSPEC = False
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+_STEAM_SEARCH_URL = "https://store.steampowered.com/api/storesearch/?{}"
+
+
+def _make_session():
+    """Общая пулённая HTTP-сессия (None, если requests не установлен)"""
+    if not HAS_REQUESTS:
+        return None
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+# Один пул на процесс: IconExtractor и CoverAPIManager ходят на одни
+# и те же CDN-хосты, поэтому делят сокеты
+_HTTP_SESSION = _make_session()
+
+
+def _http_get_ex(url: str, headers: Optional[Dict[str, str]] = None,
+                 timeout: int = 10) -> Tuple[int, bytes, Dict[str, str]]:
+    """GET с переиспользованием соединений.
+
+    Возвращает (HTTP-статус, тело, заголовки ответа); статус 0 -
+    ошибка соединения. Заголовки нужны ретраям (Retry-After).
+    """
+    if _HTTP_SESSION is not None:
+        try:
+            response = _HTTP_SESSION.get(url, headers=headers, timeout=timeout)
+            return response.status_code, response.content, response.headers
+        except Exception:
+            return 0, b'', {}
+
+    # Fallback: urllib без пула
+    try:
+        all_headers = {'User-Agent': USER_AGENT}
+        if headers:
+            all_headers.update(headers)
+        req = urllib.request.Request(url, headers=all_headers)
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status, response.read(), dict(response.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, b'', dict(e.headers or {})
+    except Exception:
+        return 0, b'', {}
+
+
+def _http_get(url: str, headers: Optional[Dict[str, str]] = None,
+              timeout: int = 10) -> Tuple[int, bytes]:
+    """GET без заголовков ответа - для мест, где ретраи не нужны"""
+    status, data, _ = _http_get_ex(url, headers=headers, timeout=timeout)
+    return status, data
+
+
+def _retry_delay(resp_headers: Dict[str, str], attempt: int) -> float:
+    """Пауза перед повтором: Retry-After сервера, иначе экспоненциальный
+    backoff с джиттером (cap 60s)"""
+    ra = resp_headers.get('Retry-After', '')
+    if ra.isdigit():
+        return min(60.0, float(ra))
+    return min(60.0, 2 ** attempt + random.uniform(0, 1))
+
+
+def _http_get_bytes(url: str, headers: Optional[Dict[str, str]] = None,
+                    timeout: int = 10) -> Optional[bytes]:
+    """GET, возвращающий тело только при HTTP 200"""
+    status, data = _http_get(url, headers=headers, timeout=timeout)
+    return data if status == 200 else None
+
+
+def _looks_like_image(headers, min_size: int) -> bool:
+    """Пре-чек по заголовкам: отбрасываем HTML-заглушки и мелкие файлы
+    до чтения тела (не качаем 10MB, чтобы узнать что это не картинка)"""
+    ctype = headers.get('Content-Type', '')
+    if ctype and not ctype.startswith('image/'):
+        return False
+    # Content-Length может отсутствовать (chunked) - тогда проверим
+    # размер уже записанного файла
+    clen = headers.get('Content-Length')
+    if clen and clen.isdigit() and int(clen) <= min_size:
+        return False
+    return True
+
+
+def _http_download(url: str, save_path: Path, timeout: int = 10,
+                   min_size: int = 2048) -> bool:
+    """Потоковое скачивание в файл буфером 64KB.
+
+    Тело не собирается в RAM целиком: память константная независимо
+    от размера обложки, а плохие ответы отсекаются по заголовкам ещё
+    до чтения тела. Пишем в .part-файл и публикуем атомарным
+    os.replace - параллельный читатель кэша (UI) никогда не видит
+    полузаписанный jpeg, а после падения не остаётся битого файла,
+    проходящего проверку размера.
+    """
+    tmp_path = save_path.with_suffix('.part')
+    try:
+        if _HTTP_SESSION is not None:
+            with _HTTP_SESSION.get(url, timeout=timeout, stream=True) as response:
+                if response.status_code != 200 or not _looks_like_image(
+                        response.headers, min_size):
+                    return False
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(1 << 16):
+                        f.write(chunk)
+        else:
+            req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                if response.status != 200 or not _looks_like_image(
+                        response.headers, min_size):
+                    return False
+                with open(tmp_path, 'wb') as f:
+                    shutil.copyfileobj(response, f, 1 << 16)
+        # Контроль на случай chunked-ответов без Content-Length
+        if tmp_path.stat().st_size > min_size:
+            os.replace(tmp_path, save_path)
+            return True
+    except Exception:
+        pass
+    tmp_path.unlink(missing_ok=True)
+    return False
+
+
+# Хэши uid/ключей кэша считаются по 2-3 раза на игру за скан, причём
+# при рескане - по тем же строкам. Мемоизация снимает и повторное
+# хэширование, и аллокации encode/hexdigest. Алгоритм остаётся md5:
+# от него зависят uid в library.json и имена файлов в cache/ -
+# смена на xxhash/blake3 инвалидировала бы библиотеку и все обложки.
+# usedforsecurity=False: ключ не криптографический, это позволяет
+# среде выбрать быструю (не FIPS-обёрнутую) реализацию
+@functools.lru_cache(maxsize=8192)
+def _hash12(s: str) -> str:
+    """12-hex идентификатор строки (uid, имена файлов кэша)"""
+    return hashlib.md5(s.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+@functools.lru_cache(maxsize=8192)
+def _hash_full(s: str) -> str:
+    """Полный 32-hex md5 (ключи обложек по названию игры)"""
+    return hashlib.md5(s.encode(), usedforsecurity=False).hexdigest()
+
+
+class SessionLRU:
+    """Потокобезопасный ограниченный LRU-кэш для session-кэшей API.
+
+    Plain dict рос без предела за долгую сессию лаунчера, а его
+    чтение-проверка-запись из воркеров пула не атомарны. cachetools
+    в зависимостях нет - OrderedDict под RLock'ом достаточно.
+    Интерфейс повторяет dict в используемом объёме (get/in/[]).
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self._data: OrderedDict = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+            return default
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __getitem__(self, key):
+        with self._lock:
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def __setitem__(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+
+class TokenBucket:
+    """Потокобезопасный rate-limiter (token bucket).
+
+    Старая схема "посмотрел elapsed - поспал - запомнил время" гонялась
+    под ThreadPool-фан-аутом: два потока одновременно видели
+    elapsed > min_delay и стреляли вместе, превышая лимит API.
+    Здесь выдача токена атомарна под Lock'ом.
+    """
+
+    def __init__(self, rate: float, per: float = 1.0):
+        self._rate = rate
+        self._per = per
+        self._tokens = float(rate)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Блокирует, пока не появится свободный токен"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._rate,
+                               self._tokens + (now - self._last) * self._rate / self._per)
+            self._last = now
+            # Токен списывается сразу (баланс может уйти в минус) -
+            # долг и определяет длину паузы; так токен, натёкший за
+            # время сна, не достаётся второму ожидающему повторно
+            self._tokens -= 1
+            wait = -self._tokens * self._per / self._rate if self._tokens < 0 else 0.0
+        # Спим уже вне лока, чтобы не выстраивать всех ожидающих в цепочку
+        if wait > 0:
+            time.sleep(wait)
+
+
+@functools.lru_cache(maxsize=4096)
+def _title_cover_key(title: str) -> str:
+    """Ключ обложки для сырого названия: очистка + md5 одним lookup'ом.
+
+    Сканеры зовут это на каждую папку при каждом рескане с теми же
+    именами - после первого прохода вся цепочка стоит один доступ
+    к словарю.
+    """
+    return _hash_full(_clean_game_name(title))
+
+
+# Сентинел для промаха кэша: None - валидное закэшированное значение
+# ("игра не нашлась" тоже результат, его не надо переискивать)
+_CACHE_MISS = object()
+
+
+class LookupCache:
+    """Персистентный кэш сетевых поисков (Steam search, SGDB, RAWG).
+
+    Словари session_cache жили только до выхода из процесса - каждый
+    перезапуск заново дёргал API по тем же названиям, сжигая лимиты.
+    Здесь результаты лежат в sqlite с TTL 30 дней: чтение с диска -
+    микросекунды против сотен миллисекунд сетевого запроса.
+    """
+
+    TTL = 30 * 24 * 3600  # 30 дней
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            # check_same_thread=False + свой Lock: читают воркеры ThreadPool
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            # WAL - читатели не блокируют писателя; NORMAL достаточно
+            # для кэша, который можно безболезненно потерять
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS lookups ("
+                "namespace TEXT, key TEXT, value TEXT, ts INTEGER, "
+                "PRIMARY KEY(namespace, key))")
+            # Отрицательный кэш обложек: игры, на которых упали все
+            # ярусы, не переискиваются следующие 24 часа
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cover_failures ("
+                "key TEXT PRIMARY KEY, ts INTEGER)")
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LookupCache недоступен, работаем без него: {e}")
+            self._conn = None
+
+    def get(self, namespace: str, key: str):
+        """Значение из кэша или _CACHE_MISS, если его нет/протухло"""
+        if self._conn is None:
+            return _CACHE_MISS
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM lookups WHERE namespace=? AND key=? "
+                    "AND ts > strftime('%s','now') - ?",
+                    (namespace, key, self.TTL)).fetchone()
+        except sqlite3.Error:
+            return _CACHE_MISS
+        if row is None:
+            return _CACHE_MISS
+        try:
+            return _jloads(row[0])
+        except ValueError:
+            return _CACHE_MISS
+
+    def put(self, namespace: str, key: str, value) -> None:
+        """Upsert значения (value - любой JSON-сериализуемый объект)"""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO lookups "
+                    "VALUES (?, ?, ?, strftime('%s','now'))",
+                    (namespace, key, _jdumps(value)))
+                self._conn.commit()
+        except (sqlite3.Error, TypeError):
+            pass
+
+    def get_failure(self, key: str) -> Optional[int]:
+        """Timestamp последнего полного провала поиска обложки или None"""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT ts FROM cover_failures WHERE key=?",
+                    (key,)).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error:
+            return None
+
+    def set_failure(self, key: str, ts: int) -> None:
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cover_failures VALUES (?, ?)",
+                    (key, ts))
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def clear_failures(self) -> None:
+        """Сброс отрицательного кэша (кнопка повторного поиска обложек)"""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cover_failures")
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+# Один кэш на процесс - как _HTTP_SESSION
+_LOOKUP_CACHE = LookupCache(Path("./cache") / "lookups.sqlite")
+
+
+
+# Мусорные токены в названиях (теги релиз-групп, платформ, изданий).
+# Компилируются один раз в общий паттерн - _clean_name вызывается на
+# каждый файл при сканировании диска
+_JUNK_TOKENS = [
+    # Release group tags
+    r'TENOKE', r'RUNE', r'DODI', r'FitGirl', r'Repack', r'EMPRESS',
+    r'CODEX', r'SKIDROW', r'CPY', r'PLAZA', r'HOODLUM', r'RAZOR1911',
+    r'TiNYiSO', r'PROPHET', r'DARKSiDERS', r'ANOMALY', r'SiMPLEX',
+
+    # Platform/Store tags
+    r'GOG', r'Portable', r'Steam', r'Epic',
+
+    # Version patterns
+    r'v\d+(\.\d+)*[a-z]?', r'Build\s*\d+', r'Update\s*\d+',
+
+    # Technical tags
+    r'DX11', r'DX12', r'x64', r'x86', r'Multi\d+', r'DLC',
+    r'VR', r'HDR', r'4K', r'UHD',
 
+    # Edition tags
+    r'GOTY', r'Game of the Year',
+    r'Enhanced Edition', r'Definitive Edition', r'Complete Edition',
+    r'Ultimate Edition', r'Deluxe Edition', r'Premium Edition',
+    r'Gold Edition', r'Legendary Edition', r'Anniversary Edition',
+
+    # Status tags
+    r'Early Access', r'Demo', r'Alpha', r'Beta', r'Preview',
+]
+
+_JUNK_RE = re.compile(r'\b(?:' + '|'.join(_JUNK_TOKENS) + r')\b', re.IGNORECASE)
+_BRACKET_RE = re.compile(r'\[.*?\]|\(.*?\)')  # [ANY TEXT] и (...) включая годы
+_TRIM_RE = re.compile(r'^[\s\-–—_.:]+|[\s\-–—_.:]+$')
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_game_name(name: str) -> str:
+    """Очистка названия игры от мусорных тегов (кэшируется - при
+    рескане одни и те же имена приходят снова и снова)"""
+    n = name.replace('.', ' ').replace('_', ' ')
+    n = _JUNK_RE.sub('', n)
+    n = _BRACKET_RE.sub('', n)
+    n = _TRIM_RE.sub('', n)
+    # Collapse multiple spaces
+    return ' '.join(n.split())
 
 
 class Platform(Enum):
@@ -91,8 +527,11 @@ class GameModel:
     collections: List[str] = field(default_factory=list)  # Список ID коллекций
     
     @staticmethod
+    @functools.lru_cache(maxsize=2048)
     def generate_uid(path: str) -> str:
-        return hashlib.md5(path.lower().encode()).hexdigest()[:12]
+        # _hash12 уже мемоизирован; этот кэш снимает ещё и .lower()
+        # на повторных рескансах тех же путей
+        return _hash12(path.lower())
     
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -104,83 +543,53 @@ class GameModel:
 
 class IconExtractor:
     """Умный загрузчик изображений с защитой от банов"""
-    
+
     def __init__(self, cache_dir: str = "./cache/icons"):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        # Снижаем кол-во потоков до 1, чтобы запросы шли последовательно и не банились
-        self._executor = ThreadPoolExecutor(max_workers=1) 
-        self._search_cache = {}
+        # Лимиты по хостам вместо одного глобального потока: банят
+        # только DDG, а Steam CDN и извлечение иконок из exe зря
+        # стояли в общей очереди
+        self._executor = ThreadPoolExecutor(max_workers=8)
+        self._host_limits = {
+            'duckduckgo.com': threading.Semaphore(1),
+            'steamstatic.com': threading.Semaphore(4),
+            'akamaihd.net': threading.Semaphore(4),
+            'steampowered.com': threading.Semaphore(2),
+        }
+        self._default_limit = threading.Semaphore(4)
+        self._search_cache = SessionLRU(2048)
+        self._cache_path_cache: Dict[str, Path] = {}
+        # Бюджет DDG на сессию: после N запросов ярус отключается,
+        # чтобы не доводить IP до 403 Ratelimit
+        self._ddg_budget = 20
+        # Кулдаун после исчерпанных ретраев: пока не истёк, DDG-ярус
+        # пропускается без попыток
+        self._ddg_cooldown_until = 0.0
+
+    def _host_limit(self, url: str) -> threading.Semaphore:
+        """Семафор для хоста URL (по домену второго уровня)"""
+        host = urllib.parse.urlsplit(url).hostname or ''
+        domain = '.'.join(host.rsplit('.', 2)[-2:])
+        return self._host_limits.get(domain, self._default_limit)
 
     def _get_cache_path(self, identifier: str) -> Path:
-        uid = hashlib.md5(identifier.lower().encode()).hexdigest()[:12]
-        return self.cache_dir / f"{uid}.jpg"
+        # Path-объекты тоже кэшируем: конструирование пути на каждый
+        # lookup заметно на рескане тысяч файлов
+        path = self._cache_path_cache.get(identifier)
+        if path is None:
+            path = self.cache_dir / f"{_hash12(identifier.lower())}.jpg"
+            self._cache_path_cache[identifier] = path
+        return path
 
     def _clean_name(self, name: str) -> str:
         """Enhanced game name cleaning with year/tag removal"""
-        n = name.replace('.', ' ').replace('_', ' ')
-
-        # Expanded junk patterns
-        junk = [
-            # Release group tags
-            r'TENOKE', r'RUNE', r'DODI', r'FitGirl', r'Repack', r'EMPRESS',
-            r'CODEX', r'SKIDROW', r'CPY', r'PLAZA', r'HOODLUM', r'RAZOR1911',
-            r'TiNYiSO', r'PROPHET', r'DARKSiDERS', r'ANOMALY', r'SiMPLEX',
-
-            # Platform/Store tags
-            r'GOG', r'Portable', r'Steam', r'Epic',
-
-            # Version patterns
-            r'v\d+(\.\d+)*[a-z]?', r'Build\s*\d+', r'Update\s*\d+',
-
-            # Technical tags
-            r'DX11', r'DX12', r'x64', r'x86', r'Multi\d+', r'DLC',
-            r'VR', r'HDR', r'4K', r'UHD',
-
-            # Edition tags
-            r'GOTY', r'Game of the Year',
-            r'Enhanced Edition', r'Definitive Edition', r'Complete Edition',
-            r'Ultimate Edition', r'Deluxe Edition', r'Premium Edition',
-            r'Gold Edition', r'Legendary Edition', r'Anniversary Edition',
-
-            # Status tags
-            r'Early Access', r'Demo', r'Alpha', r'Beta', r'Preview',
-        ]
-
-        for j in junk:
-            n = re.sub(rf'\b{j}\b', '', n, flags=re.IGNORECASE)
-
-        # Remove bracketed content [ANY TEXT]
-        n = re.sub(r'\[.*?\]', '', n)
-
-        # Remove parentheses with years (1990-2099)
-        n = re.sub(r'\((?:19|20)\d{2}\)', '', n)
-
-        # Remove other parentheses content
-        n = re.sub(r'\(.*?\)', '', n)
-
-        # Remove common separators at start/end
-        n = re.sub(r'^[\s\-–—_.:]+|[\s\-–—_.:]+$', '', n)
-
-        # Collapse multiple spaces
-        return ' '.join(n.split())
+        return _clean_game_name(name)
 
     def _download_file(self, url: str, save_path: Path) -> bool:
         """Скачивание"""
-        try:
-            req = urllib.request.Request(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            with urllib.request.urlopen(req, timeout=10) as response:
-                if response.status == 200:
-                    data = response.read()
-                    if len(data) > 2048:
-                        with open(save_path, 'wb') as f:
-                            f.write(data)
-                        return True
-        except Exception:
-            pass
-        return False
+        with self._host_limit(url):
+            return _http_download(url, save_path, timeout=10)
 
     def _search_steam_id_by_name(self, name: str) -> Optional[str]:
         """Поиск ID в Steam"""
@@ -190,38 +599,51 @@ class IconExtractor:
         if clean_name in self._search_cache:
             return self._search_cache[clean_name]
 
+        # Дисковый кэш: переживает перезапуски (None тоже кэшируется)
+        cached = _LOOKUP_CACHE.get('steam_search', clean_name)
+        if cached is not _CACHE_MISS:
+            self._search_cache[clean_name] = cached
+            return cached
+
         print(f"🔎 Ищем в Steam: '{clean_name}'")
 
         try:
-            query = urllib.parse.quote(clean_name)
-            url = f"https://store.steampowered.com/api/storesearch/?term={query}&l=english&cc=US"
-            req = urllib.request.Request(url)
-            with urllib.request.urlopen(req, timeout=5) as res:
-                data = json.load(res)
+            # urlencode реализован на C и сам экранирует значение -
+            # без ручного quote и f-string склейки
+            url = _STEAM_SEARCH_URL.format(urllib.parse.urlencode(
+                {'term': clean_name, 'l': 'english', 'cc': 'US'}))
+            raw = _http_get_bytes(url, timeout=5)
+            if raw:
+                data = _jloads(raw)
                 if data.get('total', 0) > 0:
                     appid = str(data['items'][0]['id'])
                     self._search_cache[clean_name] = appid
+                    _LOOKUP_CACHE.put('steam_search', clean_name, appid)
                     print(f"   ✅ Найдено ID: {appid}")
                     return appid
         except:
             pass
-        
+
         # Небольшая пауза, чтобы не спамить API Steam (оптимизировано)
         time.sleep(0.2)
-        
+
         self._search_cache[clean_name] = None
+        _LOOKUP_CACHE.put('steam_search', clean_name, None)
         return None
 
+    # Шаблоны CDN-ссылок - константа класса вместо пересборки списка
+    # из четырёх f-строк на каждый вызов
+    STEAM_CDN_TEMPLATES = (
+        "https://cdn.cloudflare.steamstatic.com/steam/apps/{app_id}/library_600x900.jpg",
+        "https://steamcdn-a.akamaihd.net/steam/apps/{app_id}/library_600x900.jpg",
+        "https://cdn.cloudflare.steamstatic.com/steam/apps/{app_id}/header.jpg",
+        "https://cdn.cloudflare.steamstatic.com/steam/apps/{app_id}/capsule_616x353.jpg",  # Fallback
+    )
+
     def _download_steam_cover(self, app_id: str, save_path: Path) -> bool:
         """Качает обложку Steam (расширенный список ссылок)"""
-        urls = [
-            f"https://cdn.cloudflare.steamstatic.com/steam/apps/{app_id}/library_600x900.jpg",
-            f"https://steamcdn-a.akamaihd.net/steam/apps/{app_id}/library_600x900.jpg",
-            f"https://cdn.cloudflare.steamstatic.com/steam/apps/{app_id}/header.jpg",
-            f"https://cdn.cloudflare.steamstatic.com/steam/apps/{app_id}/capsule_616x353.jpg" # Fallback
-        ]
-        for url in urls:
-            if self._download_file(url, save_path):
+        for tpl in self.STEAM_CDN_TEMPLATES:
+            if self._download_file(tpl.format(app_id=app_id), save_path):
                 return True
         return False
 
@@ -230,31 +652,47 @@ class IconExtractor:
         if not HAS_DDG:
             logger.warning("   DuckDuckGo недоступен (библиотека не загружена)")
             return False
+        # Ленивый импорт - на первом обращении, не на старте лаунчера
+        from duckduckgo_search import DDGS
         clean_name = self._clean_name(name)
-        
-        # ВАЖНО: Пауза перед запросом, чтобы избежать 403 (оптимизировано)
-        delay = random.uniform(0.3, 0.6)
         logger.info(f"   🦆 Ищем в DDG: '{clean_name}'")
-        time.sleep(delay)
-        
-        try:
-            query = f"{clean_name} game box art"
-            with DDGS() as ddgs:
-                # Ищем 3 результата для большей вероятности успеха
-                results = list(ddgs.images(query, max_results=3))
-                logger.info(f"   DDG нашёл {len(results)} изображений")
-                for res in results:
-                    if self._download_file(res['image'], save_path):
-                        logger.info(f"   ✅ Скачано через DDG")
-                        return True
-                logger.warning(f"   DDG: не удалось скачать ни одно изображение")
-        except Exception as e:
-            logger.error(f"   ❌ Ошибка DDG: {e}")
+
+        # Один запрос к DDG за раз (семафор) + экспоненциальный backoff
+        # с джиттером при 403 Ratelimit вместо фиксированной паузы
+        query = f"{clean_name} game box art"
+        with self._host_limits['duckduckgo.com']:
+            if self._ddg_budget <= 0:
+                logger.warning("   DDG: бюджет запросов на сессию исчерпан, пропускаем")
+                return False
+            if time.monotonic() < self._ddg_cooldown_until:
+                logger.warning("   DDG: кулдаун после ratelimit, пропускаем")
+                return False
+            self._ddg_budget -= 1
+            for attempt in range(3):
+                # Пауза перед запросом, чтобы избежать 403 (растёт с попытками)
+                time.sleep(random.uniform(0.3, 0.6) * (2 ** attempt))
+                try:
+                    with DDGS() as ddgs:
+                        # Ищем 3 результата для большей вероятности успеха
+                        results = list(ddgs.images(query, max_results=3))
+                    logger.info(f"   DDG нашёл {len(results)} изображений")
+                    for res in results:
+                        if self._download_file(res['image'], save_path):
+                            logger.info(f"   ✅ Скачано через DDG")
+                            return True
+                    logger.warning(f"   DDG: не удалось скачать ни одно изображение")
+                    return False
+                except Exception as e:
+                    logger.error(f"   ❌ Ошибка DDG (попытка {attempt + 1}): {e}")
+            # Три попытки подряд упали - морозим ярус, следующие игры
+            # не дёргают заблокированный хост
+            self._ddg_cooldown_until = time.monotonic() + 60.0
         return False
 
     def _extract_exe_icon(self, exe_path: str, save_path: Path) -> bool:
         if not HAS_ICOEXTRACT or not exe_path: return False
         try:
+            import icoextract
             extractor = icoextract.IconExtractor(exe_path)
             if extractor.get_icon_count() > 0:
                 data = extractor.get_icon(0)
@@ -265,14 +703,19 @@ class IconExtractor:
         return False
 
     async def get_icon(self, game_title: str, app_id: str = None, exe_path: str = None) -> Optional[str]:
-        key_id = app_id if app_id else hashlib.md5(self._clean_name(game_title).encode()).hexdigest()
+        key_id = app_id if app_id else _hash_full(self._clean_name(game_title))
         cache_path = self._get_cache_path(str(key_id))
         
         if cache_path.exists() and cache_path.stat().st_size > 1000:
             return str(cache_path)
-        
-        loop = asyncio.get_event_loop()
-        
+
+        # Каскад ярусов остаётся синхронным и уходит в общий bounded
+        # executor: event loop не блокируется, а параллелизм между
+        # играми даёт пул (max_workers) + пер-хостовые семафоры.
+        # get_running_loop вместо устаревшего get_event_loop -
+        # вызов валиден только изнутри корутины
+        loop = asyncio.get_running_loop()
+
         def process():
             # 1. Steam ID (Точно)
             if app_id:
@@ -306,43 +749,59 @@ class SteamGridDBClient:
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key
-        self.session_cache = {}
-        self._last_request_time = 0
-        self._min_delay = 0.25  # Rate limit: 4 req/sec (оптимизировано)
-
-    def _wait_rate_limit(self):
-        """Enforce rate limiting"""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self._min_delay:
-            time.sleep(self._min_delay - elapsed)
-        self._last_request_time = time.time()
+        self.session_cache = SessionLRU(2048)
+        self._bucket = TokenBucket(4, 1.0)  # Rate limit: 4 req/sec
+        # После 429/503 все запросы до этого момента отбрасываются
+        # сразу, не трогая заблокированный хост
+        self._cooldown_until = 0.0
 
     def _make_request(self, endpoint: str) -> Optional[dict]:
         """Make authenticated API request"""
         if not self.api_key:
             return None
 
-        self._wait_rate_limit()
+        # Дисковый кэш по endpoint'у: попадание не тратит ни rate-limit
+        # паузу, ни сам запрос
+        cached = _LOOKUP_CACHE.get('sgdb', endpoint)
+        if cached is not _CACHE_MISS:
+            return cached
+
+        if time.monotonic() < self._cooldown_until:
+            return None
 
         url = f"{self.BASE_URL}/{endpoint}"
 
-        try:
-            req = urllib.request.Request(url, headers={
-                'Authorization': f'Bearer {self.api_key}',
-                'User-Agent': 'CyberLauncher/1.0'
-            })
-
-            with urllib.request.urlopen(req, timeout=10) as response:
-                if response.status == 200:
-                    return json.loads(response.read())
-        except urllib.error.HTTPError as e:
-            if e.code == 401:
-                logger.error("SteamGridDB API Unauthorized (Invalid Key). Disabling API.")
-                self.api_key = None # Disable to prevent further errors
-            else:
+        for attempt in range(4):
+            self._bucket.acquire()
+            try:
+                status, data, resp_headers = _http_get_ex(url, headers={
+                    'Authorization': f'Bearer {self.api_key}',
+                    'User-Agent': 'CyberLauncher/1.0'
+                }, timeout=10)
+                if status == 200:
+                    result = _jloads(data)
+                    # Кэшируем только успешные ответы - ошибки могут быть временными
+                    _LOOKUP_CACHE.put('sgdb', endpoint, result)
+                    return result
+                if status == 401:
+                    logger.error("SteamGridDB API Unauthorized (Invalid Key). Disabling API.")
+                    self.api_key = None # Disable to prevent further errors
+                    return None
+                if status in (429, 503):
+                    # Кооперативный backoff: уважаем Retry-After и
+                    # замораживаем клиент, чтобы параллельные вызовы
+                    # не добивали лимит
+                    delay = _retry_delay(resp_headers, attempt)
+                    self._cooldown_until = time.monotonic() + delay
+                    logger.warning(f"SteamGridDB rate limited (HTTP {status}), backing off {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                if status != 0:
+                    logger.warning(f"SteamGridDB API error: HTTP {status}")
+                return None
+            except Exception as e:
                 logger.warning(f"SteamGridDB API error: {e}")
-        except Exception as e:
-            logger.warning(f"SteamGridDB API error: {e}")
+                return None
 
         return None
 
@@ -353,21 +812,29 @@ class SteamGridDBClient:
         
         try:
             url = f"{self.BASE_URL}/search/autocomplete/portal"
-            req = urllib.request.Request(url, headers={
+            status, _ = _http_get(url, headers={
                 'Authorization': f'Bearer {self.api_key}',
                 'User-Agent': 'CyberLauncher/1.0'
-            })
-            with urllib.request.urlopen(req, timeout=10) as response:
-                if response.status == 200:
-                    return True, "✅ Ключ валидный"
-        except urllib.error.HTTPError as e:
-            if e.code == 401:
+            }, timeout=10)
+            if status == 200:
+                return True, "✅ Ключ валидный"
+            if status == 401:
                 return False, "❌ Неверный ключ (401)"
-            return False, f"❌ Ошибка: {e.code}"
+            if status != 0:
+                return False, f"❌ Ошибка: {status}"
         except Exception as e:
             return False, f"❌ Ошибка: {e}"
         return False, "❌ Неизвестная ошибка"
 
+    @staticmethod
+    def _extract_grid_urls(grids: list) -> List[str]:
+        """Prefer 600x900 vertical grids, fallback to any grid"""
+        urls = [g['url'] for g in grids
+                if g.get('height') == 900 and g.get('width') == 600]
+        if not urls:
+            urls = [g['url'] for g in grids[:3]]
+        return urls
+
     def get_grids_by_steam_id(self, steam_app_id: str) -> List[str]:
         """Get grid images by Steam App ID"""
         cache_key = f"steam_{steam_app_id}"
@@ -378,18 +845,44 @@ class SteamGridDBClient:
 
         urls = []
         if data and data.get('success') and data.get('data'):
-            grids = data['data']
-            # Prefer 600x900 vertical grids
-            for grid in grids:
-                if grid.get('height') == 900 and grid.get('width') == 600:
-                    urls.append(grid['url'])
-            # Fallback to any grid
-            if not urls:
-                urls = [g['url'] for g in grids[:3]]
+            urls = self._extract_grid_urls(data['data'])
 
         self.session_cache[cache_key] = urls
         return urls
 
+    def get_grids_by_steam_ids(self, steam_app_ids: List[str]) -> Dict[str, List[str]]:
+        """Батч-вариант: грид-листы для пачки Steam App ID.
+
+        SGDB принимает до 10 id через запятую в одном запросе - N игр
+        стоят ceil(N/10) запросов и столько же rate-limit пауз вместо N.
+        Результаты оседают в session_cache, так что последующий
+        get_grids_by_steam_id того же id сети не касается.
+        """
+        result: Dict[str, List[str]] = {}
+        missing = []
+        for aid in steam_app_ids:
+            cached = self.session_cache.get(f"steam_{aid}")
+            if cached is not None:
+                result[aid] = cached
+            else:
+                missing.append(aid)
+
+        if not self.api_key:
+            return result
+
+        for i in range(0, len(missing), 10):
+            chunk = missing[i:i + 10]
+            data = self._make_request(f"grids/steam/{','.join(chunk)}")
+            if not (data and data.get('success') and data.get('data')):
+                continue
+            # Ответ батча - список записей в порядке запрошенных id
+            for aid, entry in zip(chunk, data['data']):
+                grids = entry.get('data', []) if entry.get('success') else []
+                urls = self._extract_grid_urls(grids)
+                self.session_cache[f"steam_{aid}"] = urls
+                result[aid] = urls
+        return result
+
     def search_game(self, game_name: str) -> Optional[str]:
         """Search game by name, return first game ID"""
         clean_name = urllib.parse.quote(game_name)
@@ -412,12 +905,7 @@ class SteamGridDBClient:
 
         urls = []
         if data and data.get('success') and data.get('data'):
-            grids = data['data']
-            for grid in grids:
-                if grid.get('height') == 900 and grid.get('width') == 600:
-                    urls.append(grid['url'])
-            if not urls:
-                urls = [g['url'] for g in grids[:3]]
+            urls = self._extract_grid_urls(data['data'])
 
         self.session_cache[cache_key] = urls
         return urls
@@ -430,16 +918,9 @@ class RAWGClient:
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key
-        self.session_cache = {}
-        self._last_request_time = 0
-        self._min_delay = 0.1  # 10 req/sec safe limit
-
-    def _wait_rate_limit(self):
-        """Enforce rate limiting"""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self._min_delay:
-            time.sleep(self._min_delay - elapsed)
-        self._last_request_time = time.time()
+        self.session_cache = SessionLRU(2048)
+        self._bucket = TokenBucket(10, 1.0)  # 10 req/sec safe limit
+        self._cooldown_until = 0.0
 
     def validate_key(self) -> tuple[bool, str]:
         """Validate API key. Returns (success, message)"""
@@ -449,14 +930,13 @@ class RAWGClient:
         try:
             params = urllib.parse.urlencode({'key': self.api_key, 'page_size': '1'})
             url = f"{self.BASE_URL}/games?{params}"
-            req = urllib.request.Request(url, headers={'User-Agent': 'CyberLauncher/1.0'})
-            with urllib.request.urlopen(req, timeout=10) as response:
-                if response.status == 200:
-                    return True, "✅ Ключ валидный"
-        except urllib.error.HTTPError as e:
-            if e.code == 401:
+            status, _ = _http_get(url, headers={'User-Agent': 'CyberLauncher/1.0'}, timeout=10)
+            if status == 200:
+                return True, "✅ Ключ валидный"
+            if status == 401:
                 return False, "❌ Неверный ключ (401)"
-            return False, f"❌ Ошибка: {e.code}"
+            if status != 0:
+                return False, f"❌ Ошибка: {status}"
         except Exception as e:
             return False, f"❌ Ошибка: {e}"
         return False, "❌ Неизвестная ошибка"
@@ -470,7 +950,13 @@ class RAWGClient:
         if cache_key in self.session_cache:
             return self.session_cache[cache_key]
 
-        self._wait_rate_limit()
+        cached = _LOOKUP_CACHE.get('rawg', cache_key)
+        if cached is not _CACHE_MISS:
+            self.session_cache[cache_key] = cached
+            return cached
+
+        if time.monotonic() < self._cooldown_until:
+            return None
 
         params = urllib.parse.urlencode({
             'key': self.api_key,
@@ -481,23 +967,38 @@ class RAWGClient:
 
         url = f"{self.BASE_URL}/games?{params}"
 
-        try:
-            req = urllib.request.Request(url, headers={
-                'User-Agent': 'CyberLauncher/1.0'
-            })
-
-            with urllib.request.urlopen(req, timeout=10) as response:
-                if response.status == 200:
-                    data = json.loads(response.read())
+        for attempt in range(4):
+            self._bucket.acquire()
+            try:
+                status, raw, resp_headers = _http_get_ex(
+                    url, headers={'User-Agent': 'CyberLauncher/1.0'}, timeout=10)
+                if status in (429, 503):
+                    delay = _retry_delay(resp_headers, attempt)
+                    self._cooldown_until = time.monotonic() + delay
+                    logger.warning(f"RAWG rate limited (HTTP {status}), backing off {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                if status == 200 and raw:
+                    data = _jloads(raw)
                     if data and data.get('results'):
                         game = data['results'][0]
                         image_url = game.get('background_image')
                         self.session_cache[cache_key] = image_url
+                        _LOOKUP_CACHE.put('rawg', cache_key, image_url)
                         return image_url
-        except Exception as e:
-            logger.warning(f"RAWG API error: {e}")
+                    # Пустой результат - честный ответ, кэшируем
+                    break
+                # Сетевые/прочие ошибки временные - не кэшируем отказ
+                return None
+            except Exception as e:
+                logger.warning(f"RAWG API error: {e}")
+                return None
+        else:
+            # Все попытки упёрлись в rate limit - не кэшируем
+            return None
 
         self.session_cache[cache_key] = None
+        _LOOKUP_CACHE.put('rawg', cache_key, None)
         return None
 
 
@@ -513,17 +1014,12 @@ class CoverValidator:
         if not file_path:
             return False
 
-        path = Path(file_path)
-
-        # Check existence
-        if not path.exists():
-            return False
-
-        # Check minimum size (< 2KB = likely invalid)
+        # Один os.stat вместо exists()+stat() через Path: существование
+        # и размер (< 2KB = likely invalid) проверяются за один syscall
         try:
-            if path.stat().st_size < 2048:
+            if os.stat(file_path).st_size < 2048:
                 return False
-        except:
+        except OSError:
             return False
 
         # Skip expensive PIL verification for speed - file size check is enough
@@ -536,38 +1032,38 @@ class CoverValidator:
 
         try:
             with open(self.library_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                referenced_files = set()
-
-                for game in data.get('games', []):
-                    icon_path = game.get('icon_path')
-                    if icon_path:
-                        referenced_files.add(Path(icon_path).name)
+                data = _jloads(f.read())
+            referenced_files = {
+                Path(game['icon_path']).name
+                for game in data.get('games', [])
+                if game.get('icon_path')
+            }
         except:
             return (0, 0)
 
         removed = 0
         total = 0
 
-        if self.cache_dir.exists():
-            for cache_file in self.cache_dir.glob('*.jpg'):
-                total += 1
-                if cache_file.name not in referenced_files:
-                    try:
-                        cache_file.unlink()
-                        removed += 1
-                        logger.info(f"Removed orphaned cache: {cache_file.name}")
-                    except:
-                        pass
-
-            for cache_file in self.cache_dir.glob('*.png'):
+        # Один scandir-проход вместо двух glob-обходов: DirEntry несёт
+        # тип из самого listing-syscall'а, без stat на каждый файл
+        try:
+            entries = os.scandir(self.cache_dir)
+        except OSError:
+            return (0, 0)
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.endswith('.jpg') or name.endswith('.png')):
+                    continue
+                if not entry.is_file():
+                    continue
                 total += 1
-                if cache_file.name not in referenced_files:
+                if name not in referenced_files:
                     try:
-                        cache_file.unlink()
+                        os.unlink(entry.path)
                         removed += 1
-                        logger.info(f"Removed orphaned cache: {cache_file.name}")
-                    except:
+                        logger.info(f"Removed orphaned cache: {name}")
+                    except OSError:
                         pass
 
         return (removed, total)
@@ -594,6 +1090,10 @@ class CoverAPIManager:
         self.sgdb = SteamGridDBClient(sgdb_key) if sgdb_key else None
         self.rawg = RAWGClient(rawg_key) if rawg_key else None
         self.icon_extractor = IconExtractor(str(self.cache_dir))
+        # Снимок содержимого папки кэша: {имя файла: размер}. Заполняется
+        # одним scandir перед сканированием, чтобы пре-чеки обложек
+        # не делали stat на каждую игру
+        self._cache_index: Optional[Dict[str, int]] = None
 
         if sgdb_key:
             logger.info("SteamGridDB API initialized")
@@ -602,29 +1102,104 @@ class CoverAPIManager:
 
     def _download_image(self, url: str, save_path: Path) -> bool:
         """Download image from URL"""
-        try:
-            req = urllib.request.Request(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            with urllib.request.urlopen(req, timeout=15) as response:
-                if response.status == 200:
-                    data = response.read()
-                    if len(data) > 2048:
-                        with open(save_path, 'wb') as f:
-                            f.write(data)
-                        return True
-        except Exception as e:
-            logger.debug(f"Download failed from {url}: {e}")
-        return False
+        return _http_download(url, save_path, timeout=15)
 
     
-    def get_cover(self, game_title: str, app_id: str = None, exe_path: str = None) -> Tuple[Optional[str], str]:
-        """Main cover retrieval with 7-tier fallback. Returns (path, source)"""
-        clean_name = self.icon_extractor._clean_name(game_title)
-        key_id = app_id if app_id else hashlib.md5(clean_name.encode()).hexdigest()
-        cache_path = self.cache_dir / f"{hashlib.md5(str(key_id).lower().encode()).hexdigest()[:12]}.jpg"
+    def cache_path_for(self, key_id: str) -> Path:
+        """Путь файла обложки для ключа (app_id или _hash_full названия).
+
+        Единственное место, где ключ превращается в имя файла - раньше
+        сканеры и get_cover хэшировали независимо и местами по-разному,
+        из-за чего проверка кэша в DiskScanner никогда не попадала.
+
+        Имя сознательно выводится из ключа игры, а не из SHA содержимого
+        (content-addressed store): ярус 1 и пре-чеки сканеров должны
+        уметь найти обложку ДО скачивания байтов, чего хэш содержимого
+        не позволяет. Дубликаты между играми редки (у каждой своя
+        обложка), так что дедупликация не окупила бы потерю кэш-хитов.
+        """
+        return self.cache_dir / f"{_hash12(str(key_id).lower())}.jpg"
+
+    def refresh_cache_index(self):
+        """Один scandir вместо N stat'ов: размеры приходят из самого
+        листинга каталога. Вызывается перед массовым сканированием"""
+        try:
+            with os.scandir(self.cache_dir) as it:
+                self._cache_index = {e.name: e.stat().st_size
+                                     for e in it if e.is_file()}
+        except OSError:
+            self._cache_index = None
+
+    def delete_cover(self, path: str) -> None:
+        """Удаление файла обложки вместе с его записью в снимке индекса.
+
+        Прямой unlink из UI оставлял в _cache_index фантомную запись,
+        и ярус 1 следующего get_cover возвращал путь только что
+        удалённого файла. missing_ok гасит частый случай 'файла уже
+        нет'; OSError остаётся для залоченных файлов.
+        """
+        p = Path(path)
+        try:
+            p.unlink(missing_ok=True)
+        except OSError:
+            pass
+        if self._cache_index is not None:
+            self._cache_index.pop(p.name, None)
+
+    def has_valid_cached(self, key_id: str) -> Optional[Path]:
+        """Path валидной закэшированной обложки или None"""
+        p = self.cache_path_for(key_id)
+        # Попадание в снимок - ноль syscall'ов; промах перепроверяем
+        # stat'ом: файл мог появиться уже после снимка
+        if self._cache_index is not None and self._cache_index.get(p.name, 0) > 2048:
+            return p
+        try:
+            return p if p.stat().st_size > 2048 else None
+        except OSError:
+            return None
+
+    def prefetch_steam_grids(self, app_ids: List[str]) -> None:
+        """Прогрев SGDB-кэша одним батч-запросом перед фан-аутом
+        get_cover: ярус 4 для этих id дальше читает из session_cache"""
+        if self.sgdb and app_ids:
+            self.sgdb.get_grids_by_steam_ids(app_ids)
+
+    def get_cover(self, game_title: str, app_id: str = None, exe_path: str = None,
+                  budget: Optional[float] = None,
+                  force: bool = False) -> Tuple[Optional[str], str]:
+        """Main cover retrieval with 7-tier fallback. Returns (path, source)
+
+        budget - бюджет времени в секундах на сетевые ярусы. Для
+        интерактивного 'обновить обложку' UI передаёт маленький бюджет:
+        быстрый отказ вместо многоминутной цепочки ретраев по всем
+        ярусам. Фоновые/массовые вызовы идут без бюджета.
+
+        force - игнорировать отрицательный кэш. Явное действие
+        пользователя ('Авто-поиск в API') обязано реально сходить в
+        сеть, даже если вчерашний автоматический поиск уже провалился.
+        """
+        deadline = (time.monotonic() + budget) if budget is not None else None
 
-        # Tier 1: Cache (already validated by caller, but if we are here, we are fetching new)
+        def _expired() -> bool:
+            return deadline is not None and time.monotonic() > deadline
+
+        clean_name = self.icon_extractor._clean_name(game_title)
+        key_id = app_id if app_id else _hash_full(clean_name)
+        cache_path = self.cache_path_for(key_id)
+
+        # Tier 1: Cache
+        cached = self.has_valid_cached(key_id)
+        if cached:
+            return (str(cached), "Cache")
+
+        # Отрицательный кэш: если недавно упали все ярусы по этому
+        # названию, не жжём сеть и DDG-лимиты на заведомо безнадёжный
+        # поиск (setup.exe и прочие служебные exe)
+        if not force:
+            failed_ts = _LOOKUP_CACHE.get_failure(clean_name)
+            if failed_ts is not None and time.time() - failed_ts < 86400:
+                logger.info(f"[Tier 1] Negative cache hit, skipping: '{clean_name}'")
+                return (None, "cache:neg")
 
         # Tier 2: Steam Direct CDN (fast, free, no API key needed)
         if app_id:
@@ -634,15 +1209,16 @@ class CoverAPIManager:
                 return (str(cache_path), "Steam CDN")
 
         # Tier 3: Steam Store Search → CDN (find ID by name, then download)
-        logger.info(f"[Tier 3] Steam Store Search: '{clean_name}'")
-        found_id = self.icon_extractor._search_steam_id_by_name(game_title)
-        if found_id:
-            if self.icon_extractor._download_steam_cover(found_id, cache_path):
-                logger.info(f"   ✅ Downloaded from Steam Store")
-                return (str(cache_path), "Steam Store")
+        if not _expired():
+            logger.info(f"[Tier 3] Steam Store Search: '{clean_name}'")
+            found_id = self.icon_extractor._search_steam_id_by_name(game_title)
+            if found_id:
+                if self.icon_extractor._download_steam_cover(found_id, cache_path):
+                    logger.info(f"   ✅ Downloaded from Steam Store")
+                    return (str(cache_path), "Steam Store")
 
         # Tier 4: SteamGridDB by Steam App ID (higher quality, needs API key)
-        if app_id and self.sgdb:
+        if app_id and self.sgdb and not _expired():
             logger.info(f"[Tier 4] SteamGridDB by ID: {app_id}")
             urls = self.sgdb.get_grids_by_steam_id(app_id)
             for url in urls:
@@ -651,7 +1227,7 @@ class CoverAPIManager:
                     return (str(cache_path), "SteamGridDB")
 
         # Tier 5: RAWG.io Search
-        if self.rawg:
+        if self.rawg and not _expired():
             logger.info(f"[Tier 5] RAWG.io: '{clean_name}'")
             image_url = self.rawg.search_game(clean_name)
             if image_url:
@@ -660,7 +1236,7 @@ class CoverAPIManager:
                     return (str(cache_path), "RAWG.io")
 
         # Tier 6: SteamGridDB by Name
-        if self.sgdb:
+        if self.sgdb and not _expired():
             logger.info(f"[Tier 6] SteamGridDB by Name: '{clean_name}'")
             game_id = self.sgdb.search_game(clean_name)
             if game_id:
@@ -671,10 +1247,11 @@ class CoverAPIManager:
                         return (str(cache_path), "SteamGridDB")
 
         # Tier 7: DuckDuckGo (last resort for images)
-        logger.info(f"[Tier 7] DuckDuckGo: '{clean_name}'")
-        if self.icon_extractor._search_duckduckgo(game_title, cache_path):
-            logger.info(f"   ✅ Downloaded from DuckDuckGo")
-            return (str(cache_path), "DuckDuckGo")
+        if not _expired():
+            logger.info(f"[Tier 7] DuckDuckGo: '{clean_name}'")
+            if self.icon_extractor._search_duckduckgo(game_title, cache_path):
+                logger.info(f"   ✅ Downloaded from DuckDuckGo")
+                return (str(cache_path), "DuckDuckGo")
 
         # Tier 8: EXE Icon
         if exe_path:
@@ -683,9 +1260,63 @@ class CoverAPIManager:
                 logger.info(f"   ✅ Extracted from EXE")
                 return (str(cache_path), "EXE Icon")
 
+        # Истёкший бюджет - не провал всех ярусов: не отравляем
+        # отрицательный кэш, фоновый проход без бюджета ещё может найти
+        if _expired():
+            logger.warning(f"   ⏱ Cover budget exhausted for: {game_title}")
+            return (None, "timeout")
+
         logger.warning(f"   ❌ All tiers failed for: {game_title}")
+        _LOOKUP_CACHE.set_failure(clean_name, int(time.time()))
         return (None, "None")
 
+    def invalidate_failures(self) -> None:
+        """Сброс отрицательного кэша - для UI-кнопки 'искать обложки заново'"""
+        _LOOKUP_CACHE.clear_failures()
+
+
+def _encode_cover(source_bytes: bytes, cache_path: Path) -> bool:
+    """PIL-конвейер: верификация, конвертация в RGB, даунскейл, JPEG.
+
+    Работает по байтам через BytesIO - источник читается с диска/сети
+    один раз (verify() и повторный open не перечитывают файл).
+    """
+    from PIL import Image
+
+    try:
+        Image.open(io.BytesIO(source_bytes)).verify()
+    except Exception:
+        return False
+
+    img = Image.open(io.BytesIO(source_bytes))
+
+    # Convert RGBA to RGB if necessary
+    if img.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', img.size, (0, 0, 0))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        if img.mode in ('RGBA', 'LA'):
+            background.paste(img, mask=img.split()[-1])
+        else:
+            background.paste(img)
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # Resize if too large (max 1200x1800)
+    max_size = (1200, 1800)
+    if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
+        # При уменьшении >2x: грубый BILINEAR-проход до двойного
+        # размера, LANCZOS - только финальный (в разы быстрее,
+        # визуально неотличимо)
+        if img.size[0] > max_size[0] * 2 or img.size[1] > max_size[1] * 2:
+            img.thumbnail((max_size[0] * 2, max_size[1] * 2),
+                          Image.Resampling.BILINEAR)
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+    img.save(cache_path, 'JPEG', quality=90)
+    return True
+
 
 class CoverUploader:
     """Handles manual cover art uploads"""
@@ -694,54 +1325,38 @@ class CoverUploader:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
+    def _store_cover(self, game_uid: str, source_bytes: bytes) -> Optional[str]:
+        """Кладёт обложку в кэш, пропуская перекодирование, если тот же
+        контент уже сохранён (хэш источника лежит в .sha-сайдкаре)"""
+        cache_path = self.cache_dir / (_hash12(game_uid) + ".jpg")
+        digest = hashlib.blake2b(source_bytes, digest_size=8).hexdigest()
+        sha_path = cache_path.with_suffix('.sha')
+        try:
+            if cache_path.exists() and sha_path.read_text() == digest:
+                logger.info(f"Cover for {game_uid} unchanged, skipping re-encode")
+                return str(cache_path)
+        except OSError:
+            pass
+
+        if not _encode_cover(source_bytes, cache_path):
+            logger.error(f"Invalid image data for game {game_uid}")
+            return None
+        try:
+            sha_path.write_text(digest)
+        except OSError:
+            pass
+
+        logger.info(f"Uploaded cover for game {game_uid}: {cache_path}")
+        return str(cache_path)
+
     def upload_from_file(self, game_uid: str, source_path: str) -> Optional[str]:
         """Upload cover from local file"""
         try:
-            from PIL import Image
-
             source = Path(source_path)
             if not source.exists():
                 return None
-
-            # Validate it's an image
-            try:
-                img = Image.open(source)
-                img.verify()
-            except:
-                logger.error(f"Invalid image file: {source_path}")
-                return None
-
-            # Generate cache filename
-            cache_name = hashlib.md5(game_uid.encode()).hexdigest()[:12] + ".jpg"
-            cache_path = self.cache_dir / cache_name
-
-            # Re-open after verify and convert
-            img = Image.open(source)
-
-            # Convert RGBA to RGB if necessary
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (0, 0, 0))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                if img.mode in ('RGBA', 'LA'):
-                    background.paste(img, mask=img.split()[-1])
-                else:
-                    background.paste(img)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            # Resize if too large (max 1200x1800)
-            max_size = (1200, 1800)
-            if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
-                img.thumbnail(max_size, Image.Resampling.LANCZOS)
-
-            # Save as JPEG
-            img.save(cache_path, 'JPEG', quality=90)
-
-            logger.info(f"Uploaded cover for game {game_uid}: {cache_path}")
-            return str(cache_path)
-
+            # Один read на весь конвейер - дальше только BytesIO
+            return self._store_cover(game_uid, source.read_bytes())
         except Exception as e:
             logger.error(f"Cover upload failed: {e}")
             return None
@@ -753,43 +1368,187 @@ class CoverUploader:
             if not url.startswith(('http://', 'https://')):
                 return None
 
-            # Download to temp location
-            req = urllib.request.Request(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
+            # Скачанные байты идут в конвейер напрямую, без
+            # промежуточного temp-файла
+            data = _http_get_bytes(url, timeout=15)
+            if data:
+                return self._store_cover(game_uid, data)
+        except Exception as e:
+            logger.error(f"Cover upload from URL failed: {e}")
+        return None
 
-            with urllib.request.urlopen(req, timeout=15) as response:
-                if response.status == 200:
-                    data = response.read()
 
-                    # Save to temp file
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.tmp') as tmp:
-                        tmp.write(data)
-                        tmp_path = tmp.name
+class ThumbnailCache:
+    """Миниатюры обложек под размер карточки грида.
 
-                    # Use upload_from_file to process
-                    result = self.upload_from_file(game_uid, tmp_path)
+    Полноразмерные обложки - мегабайтные JPEG'и, которые рендерер
+    декодирует и масштабирует на каждую карточку. Миниатюра 220x340
+    весит десятки КБ и декодируется мгновенно; оригинал остаётся для
+    диалогов и перегенерации.
+    """
 
-                    # Cleanup temp
-                    try:
-                        Path(tmp_path).unlink()
-                    except:
-                        pass
+    THUMB_SIZE = (220, 340)
 
-                    return result
+    def __init__(self, thumb_dir: Path):
+        self.thumb_dir = Path(thumb_dir)
+        self.thumb_dir.mkdir(parents=True, exist_ok=True)
+
+    def thumb_path_for(self, icon_path: str) -> Path:
+        return self.thumb_dir / f"{_hash12(icon_path)}.jpg"
+
+    def _build_one(self, icon_path: str) -> Optional[str]:
+        from PIL import Image
+
+        thumb_path = self.thumb_path_for(icon_path)
+        try:
+            src_mtime = os.stat(icon_path).st_mtime_ns
+        except OSError:
+            return None
+        try:
+            # Миниатюра свежее источника - перегенерация не нужна
+            if os.stat(thumb_path).st_mtime_ns >= src_mtime:
+                return str(thumb_path)
+        except OSError:
+            pass
+        try:
+            img = Image.open(icon_path)
+            img.thumbnail(self.THUMB_SIZE)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            tmp = thumb_path.with_suffix('.part')
+            img.save(tmp, 'JPEG', quality=82)
+            os.replace(tmp, thumb_path)
+            return str(thumb_path)
         except Exception as e:
-            logger.error(f"Cover upload from URL failed: {e}")
-        return None
+            logger.warning(f"Thumbnail failed for {icon_path}: {e}")
+            return None
+
+    def build_all(self, icon_paths: List[str]) -> Dict[str, str]:
+        """Строит недостающие миниатюры в пуле потоков и возвращает
+        {icon_path: thumb_path} для успешно обработанных"""
+        unique = [p for p in dict.fromkeys(icon_paths) if p]
+        if not unique:
+            return {}
+        thumbs: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for icon_path, thumb in zip(unique, pool.map(self._build_one, unique)):
+                if thumb:
+                    thumbs[icon_path] = thumb
+        return thumbs
+
+
+# Токены VDF: строка в кавычках с \-экранированием. Один линейный
+# проход вместо трёх re.search по файлу; корректно читает имена
+# с экранированными кавычками, на которых старые паттерны ломались.
+# Паттерн байтовый - работает прямо по mmap без декодирования файла
+_VDF_STRING_RE = re.compile(rb'"((?:\\.|[^"\\])*)"')
+
+_ACF_WANTED = (b'name', b'appid', b'installdir')
+
+
+def _parse_acf_fields(buf) -> Dict[str, str]:
+    """Вытаскивает плоские поля AppState из appmanifest_*.acf.
+
+    В ACF и ключи, и значения - строки в кавычках, а секции открываются
+    скобкой без кавычек, поэтому пары key/value читаются прямо из
+    потока строковых токенов. buf - bytes или mmap: UTF-8 декодируются
+    только найденные значения, а не весь файл.
+    """
+    tokens = _VDF_STRING_RE.findall(buf)
+    fields: Dict[str, str] = {}
+    for i, tok in enumerate(tokens):
+        if tok in _ACF_WANTED and i + 1 < len(tokens):
+            key = tok.decode()
+            if key not in fields:
+                fields[key] = (tokens[i + 1].decode('utf-8', 'replace')
+                               .replace('\\"', '"').replace('\\\\', '\\'))
+                if len(fields) == len(_ACF_WANTED):
+                    break
+    return fields
+
+
+_APPMANIFEST_RE = re.compile(r'appmanifest_(\d+)\.acf$')
+
+# Служебные AppID Steam (redistributables, рантаймы Proton/Linux,
+# SDK) - это не игры, их манифесты даже не открываем
+_SKIP_APPIDS = frozenset({
+    '228980',   # Steamworks Common Redistributables
+    '1070560',  # Steam Linux Runtime 1.0 (scout)
+    '1391110',  # Steam Linux Runtime 2.0 (soldier)
+    '1628350',  # Steam Linux Runtime 3.0 (sniper)
+    '1826330',  # Proton EasyAntiCheat Runtime
+    '1887720',  # Proton 7.0
+    '2180100',  # Proton Hotfix
+    '2348590',  # Proton 8.0
+    '2805730',  # Proton 9.0
+    '858280',   # Proton BattlEye Runtime
+    '961940',   # Proton 3.16
+    '1054830',  # Proton 4.2
+    '1113280',  # Proton 4.11
+    '1245040',  # Proton 5.0
+    '1420170',  # Proton 5.13
+    '1580130',  # Proton 6.3
+})
 
 
 class SteamScanner:
+    MANIFEST_CACHE_FILE = Path("./cache") / "manifests.json"
+
+    def __init__(self):
+        # Кэш разобранных манифестов по (mtime_ns, size): между
+        # сканами файлы почти не меняются, а их десятки на библиотеку
+        self._manifest_cache: Dict[str, list] = {}
+        try:
+            with open(self.MANIFEST_CACHE_FILE, 'r', encoding='utf-8') as f:
+                self._manifest_cache = _jloads(f.read())
+        except (OSError, ValueError):
+            pass
+
+    def _parse_manifest(self, path: str) -> Optional[Tuple[str, str, str]]:
+        """(name, appid, installdir) манифеста; None, если не читается"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        cached = self._manifest_cache.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            entry = cached[2]
+            return tuple(entry) if entry else None
+        try:
+            # mmap: ядро подкачивает страницы по мере чтения regex'ом
+            # и держит их в page cache между сканами - без копии файла
+            # в хипе процесса
+            with open(path, 'rb') as f:
+                if st.st_size > 0:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        fields = _parse_acf_fields(mm)
+                else:
+                    fields = {}
+            result = None
+            if 'name' in fields and 'appid' in fields:
+                result = (fields['name'], fields['appid'],
+                          fields.get('installdir', ''))
+        except OSError:
+            return None
+        self._manifest_cache[path] = [st.st_mtime_ns, st.st_size,
+                                      list(result) if result else None]
+        return result
+
+    def _save_manifest_cache(self):
+        try:
+            self.MANIFEST_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.MANIFEST_CACHE_FILE, 'w', encoding='utf-8') as f:
+                f.write(_jdumps(self._manifest_cache))
+        except OSError:
+            pass
+
     async def scan(self, cover_manager: 'CoverAPIManager', excluded_paths: List[str] = None) -> List[GameModel]:
         return await asyncio.to_thread(self.scan_sync, cover_manager, excluded_paths)
 
     def scan_sync(self, cover_manager: 'CoverAPIManager', excluded_paths: List[str] = None) -> List[GameModel]:
         logger.info("Starting Steam scan...")
         games = []
-        excluded = set(str(Path(p).resolve()).lower() for p in (excluded_paths or []))
+        excluded = set(os.path.realpath(p).lower() for p in (excluded_paths or []))
         
         steam_path = None
         try:
@@ -816,50 +1575,76 @@ class SteamScanner:
             except:
                 pass
 
+        # Сначала собираем все манифесты, потом тянем обложки
+        found = []  # (name, appid, install_path)
         for lib in set(lib_paths):
             if not os.path.exists(lib):
                 continue
             for f in os.listdir(lib):
-                if f.startswith("appmanifest_") and f.endswith(".acf"):
+                m = _APPMANIFEST_RE.match(f)
+                if m:
+                    # AppID виден прямо в имени файла: redistributables
+                    # отсеиваются без открытия манифеста
+                    if m.group(1) in _SKIP_APPIDS:
+                        continue
+                    parsed = self._parse_manifest(os.path.join(lib, f))
+                    if not parsed:
+                        continue
+                    n, aid, idir = parsed
+                    if aid in _SKIP_APPIDS:
+                        continue
+                    full_path = os.path.join(lib, "common", idir)
+
+                    # EXCLUSION CHECK
+                    if os.path.realpath(full_path).lower() in excluded:
+                        logger.info(f"Skipping excluded Steam game: {n}")
+                        continue
+
+                    found.append((n, aid, full_path))
+
+        self._save_manifest_cache()
+
+        # Обложки качаем параллельно: один вызов get_cover может пройти
+        # до 7 сетевых ярусов с rate-limit паузами, поэтому
+        # последовательный проход по библиотеке занимает минуты.
+        # Сначала - дешёвая проверка кэша, сеть только для промахов
+        icons: Dict[str, Optional[str]] = {}
+        to_fetch = []
+        for n, aid, _ in found:
+            cached = cover_manager.has_valid_cached(aid)
+            if cached:
+                icons[aid] = str(cached)
+            else:
+                to_fetch.append((n, aid))
+
+        if to_fetch:
+            # Один батч-запрос к SGDB на всю пачку вместо запроса
+            # на игру внутри каждого get_cover
+            cover_manager.prefetch_steam_grids([aid for _, aid in to_fetch])
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                futures = {
+                    executor.submit(cover_manager.get_cover, n, aid): aid
+                    for n, aid in to_fetch
+                }
+                for future in as_completed(futures):
+                    aid = futures[future]
                     try:
-                        with open(os.path.join(lib, f), 'r', encoding='utf-8') as af:
-                            data = af.read()
-                            name = re.search(r'"name"\s+"([^"]+)"', data)
-                            appid = re.search(r'"appid"\s+"(\d+)"', data)
-                            install = re.search(r'"installdir"\s+"([^"]+)"', data)
-
-                            if name and appid:
-                                n = name.group(1)
-                                aid = appid.group(1)
-                                idir = install.group(1) if install else ""
-                                if aid in ['228980', '1070560', '1391110']:
-                                    continue
-                                full_path = os.path.join(lib, "common", idir)
-                                
-                                # EXCLUSION CHECK
-                                if str(Path(full_path).resolve()).lower() in excluded:
-                                    logger.info(f"Skipping excluded Steam game: {n}")
-                                    continue
-                                
-                                # OPTIMIZATION: Check cache first before API calls
-                                cache_key = hashlib.md5(aid.lower().encode()).hexdigest()[:12]
-                                cache_path = cover_manager.cache_dir / f"{cache_key}.jpg"
-                                if cache_path.exists() and cache_path.stat().st_size > 2048:
-                                    icon = str(cache_path)
-                                else:
-                                    icon, _ = cover_manager.get_cover(n, app_id=aid) # Unpack tuple
-                                
-                                games.append(GameModel(
-                                    uid=GameModel.generate_uid(f"steam_{aid}"),
-                                    title=n,
-                                    exe_path=f"steam://rungameid/{aid}",
-                                    icon_path=icon,
-                                    platform=Platform.STEAM.value,
-                                    app_id=aid,
-                                    install_path=full_path
-                                ))
-                    except:
-                        pass
+                        icon, _ = future.result()  # Unpack tuple
+                    except Exception as e:
+                        logger.warning(f"Cover fetch failed for appid {aid}: {e}")
+                        icon = None
+                    icons[aid] = icon
+
+        for n, aid, full_path in found:
+            games.append(GameModel(
+                uid=GameModel.generate_uid(f"steam_{aid}"),
+                title=n,
+                exe_path=f"steam://rungameid/{aid}",
+                icon_path=icons.get(aid),
+                platform=Platform.STEAM.value,
+                app_id=aid,
+                install_path=full_path
+            ))
         return games
 
 
@@ -871,53 +1656,116 @@ class DiskScanner:
     IGNORE_DIRS = {'windows', 'window.old', 'program data', 'users', '$recycle.bin', 'system volume information', 'common files', 'microsoft', 'drivers', 'directx', 'vcredist', 'support', 'redist', 'prerequisites'}
     IGNORE_FILES = {'unins', 'setup', 'update', 'config', 'crash', 'unitycrashhandler', 'dxsetup', 'vcredist', 'redist', 'console', 'terminal', 'server', 'launcher'}
 
+    # Все подстроки IGNORE_FILES одним скомпилированным паттерном:
+    # вместо 13 последовательных `in` на каждое имя файла - один
+    # линейный проход. Длинные токены первыми, чтобы альтернация
+    # не обрывалась на коротком префиксе
+    _IGNORE_FILES_RE = re.compile('|'.join(
+        map(re.escape, sorted(IGNORE_FILES, key=len, reverse=True))))
+
+    # Фингерпринт-кэш результатов сканирования: {путь папки:
+    # [mtime_ns, exe_path, название]}. Папка с неизменным mtime
+    # переиспользует прошлый результат без поиска exe и обложек
+    SCAN_CACHE_FILE = Path("./cache") / "scan_cache.json"
+
     def __init__(self):
-        pass
+        self._scan_cache: Dict[str, list] = {}
+        try:
+            if self.SCAN_CACHE_FILE.exists():
+                with open(self.SCAN_CACHE_FILE, 'rb') as f:
+                    self._scan_cache = _jloads(f.read())
+        except Exception as e:
+            logger.warning(f"Не удалось загрузить кэш сканирования: {e}")
+
+    def _save_scan_cache(self):
+        try:
+            self.SCAN_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.SCAN_CACHE_FILE, 'wb') as f:
+                f.write(_jdumpb(self._scan_cache))
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить кэш сканирования: {e}")
+
+    def _is_game_exe(self, entry: os.DirEntry) -> bool:
+        """Эвристика: является ли файл игровым исполняемым файлом.
+
+        Принимает DirEntry: на Windows entry.stat() отдаёт размер из
+        данных FindFirstFile, закэшированных при листинге каталога, -
+        ни одного дополнительного syscall на кандидата.
+        """
+        name_lower = entry.name.lower()
 
-    def _is_game_exe(self, path: Path) -> bool:
-        """Эвристика: является ли файл игровым исполняемым файлом"""
-        name_lower = path.name.lower()
-        
         # 1. Проверка расширения (только exe)
-        if path.suffix.lower() != ".exe":
+        if not name_lower.endswith(".exe"):
             return False
-            
-        # 2. Игнорирование по имени файла
-        if any(x in name_lower for x in self.IGNORE_FILES):
-            return False
-            
-        # 3. Размер файла (игры обычно > 500 КБ, маленькие exe часто лаунчеры или утилиты)
+
+        # 2. Размер файла (игры обычно > 500 КБ, маленькие exe часто
+        # лаунчеры или утилиты). Размер на Windows бесплатный (см. выше),
+        # а отсекает он больше кандидатов, чем имя, - поэтому раньше regex
         try:
-            if path.stat().st_size < 512 * 1024: # < 512KB
+            if entry.stat().st_size < 512 * 1024: # < 512KB
                 return False
-        except:
+        except OSError:
             return False
-            
-        return True
 
-    def _find_best_exe(self, folder: Path) -> Optional[Path]:
-        """Находит главный exe в папке игры"""
-        exes = []
+        # 3. Игнорирование по имени файла - самый дорогой фильтр последним.
+        # Короткого замыкания по длине имени здесь нет намеренно: токены
+        # блок-листа - подстроки, и длинные имена вроде
+        # UnityCrashHandler64.exe обязаны через него проходить
+        return not self._IGNORE_FILES_RE.search(name_lower)
+
+    # Технические подпапки, в которые не спускаемся (кроме Binaries для UE)
+    SKIP_SUBDIRS = {'bin', 'tools', 'redist', 'support', '_commonredist',
+                    'directx', 'vcredist', 'prerequisites', '__installer',
+                    'engine', 'plugins', 'update', 'patch'}
+
+    # Полный блок-лист для глубокого обхода: игнорируемые папки верхнего
+    # уровня отсекаются и внутри дерева игры (symlink на Windows,
+    # Common Files и т.п.), не перечисляясь вовсе
+    _PRUNE_DIRS = SKIP_SUBDIRS | IGNORE_DIRS
+
+    # Ищем exe на нескольких уровнях глубины (до 4 для UE/Unity игр)
+    MAX_EXE_DEPTH = 3
+
+    def _collect_exes(self, dir_path: str, depth: int, exes: List[Path]):
+        """Рекурсивный scandir-обход: DirEntry несёт тип и имя из самого
+        листинга, без stat на запись, а технические поддеревья
+        отсекаются целиком, не перечисляясь (glob их сначала собирал).
+
+        Ссылки ВНУТРИ дерева игры сознательно не разыменовываются:
+        здесь нет дедупликации путей, и симлинк-цикл зациклил бы обход.
+        Junction на саму папку игры обрабатывается уровнем выше -
+        scan_sync следует по ссылкам первого уровня.
+        """
         try:
-            # Ищем exe на нескольких уровнях глубины (до 4 для UE/Unity игр)
-            # Приоритет: корень > 1 уровень > 2 уровня > 3 уровня
-            search_patterns = ["*.exe", "*/*.exe", "*/*/*.exe", "*/*/*/*.exe"]
-
-            for pattern in search_patterns:
-                for item in folder.glob(pattern):
-                    # Пропускаем папки с техническими именами (кроме Binaries для UE)
-                    parent_parts = [p.lower() for p in item.relative_to(folder).parts[:-1]]
-                    skip_dirs = {'bin', 'tools', 'redist', 'support', '_commonredist',
-                                 'directx', 'vcredist', 'prerequisites', '__installer',
-                                 'engine', 'plugins', 'update', 'patch'}
-                    if any(d in skip_dirs for d in parent_parts):
-                        continue
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if (depth < self.MAX_EXE_DEPTH
+                                and entry.name.lower() not in self._PRUNE_DIRS):
+                            self._collect_exes(entry.path, depth + 1, exes)
+                    elif self._is_game_exe(entry):
+                        # Path строим только для выживших кандидатов
+                        exes.append(Path(entry.path))
+        except OSError:
+            pass
 
-                    if self._is_game_exe(item):
-                        exes.append(item)
-        except:
+    class _KeepAlnum(dict):
+        """Таблица для str.translate: не-ASCII-алфанумерика удаляется.
+
+        str.translate с табличным поиском в C быстрее regex-подстановки
+        для чистой фильтрации символов; __missing__ удаляет любой
+        кодпоинт вне [a-z0-9] - та же семантика, что у re.sub(r'[^a-z0-9]')
+        """
+        def __missing__(self, cp):
             return None
-            
+
+    _ALNUM_TABLE = _KeepAlnum({ord(c): c for c in 'abcdefghijklmnopqrstuvwxyz0123456789'})
+
+    def _find_best_exe(self, folder: Path) -> Optional[Path]:
+        """Находит главный exe в папке игры"""
+        exes: List[Path] = []
+        self._collect_exes(str(folder), 0, exes)
+
         if not exes:
             return None
 
@@ -940,13 +1788,13 @@ class DiskScanner:
                 return exe
 
         # 2. Совпадение с удалением пробелов/символов
-        clean_folder = re.sub(r'[^a-z0-9]', '', folder_name)
+        clean_folder = folder_name.translate(self._ALNUM_TABLE)
         for exe in exes:
-            clean_name = re.sub(r'[^a-z0-9]', '', exe.stem.lower())
+            clean_name = exe.stem.lower().translate(self._ALNUM_TABLE)
             if clean_name == clean_folder:
                 return exe
             # Также проверяем имя родительской папки
-            clean_parent = re.sub(r'[^a-z0-9]', '', exe.parent.name.lower())
+            clean_parent = exe.parent.name.lower().translate(self._ALNUM_TABLE)
             if clean_parent and clean_name == clean_parent:
                 return exe
 
@@ -960,79 +1808,193 @@ class DiskScanner:
         exes.sort(key=lambda x: x.stat().st_size, reverse=True)
         return exes[0]
 
-    async def scan(self, cover_manager: 'CoverAPIManager', excluded_paths: List[str] = None, additional_paths: List[str] = None) -> List[GameModel]:
-        return await asyncio.to_thread(self.scan_sync, cover_manager, excluded_paths, additional_paths)
+    async def scan(self, cover_manager: 'CoverAPIManager', excluded_paths: List[str] = None, additional_paths: List[str] = None, known_installs: Dict[str, GameModel] = None) -> List[GameModel]:
+        return await asyncio.to_thread(self.scan_sync, cover_manager, excluded_paths, additional_paths, known_installs)
 
-    def scan_sync(self, cover_manager: 'CoverAPIManager', excluded_paths: List[str] = None, additional_paths: List[str] = None) -> List[GameModel]:
+    def _probe_folder(self, item: Path, excluded: set,
+                      cover_manager: 'CoverAPIManager'):
+        """Дисковая часть обработки папки: поиск exe и проверка кэша
+        обложки. Сети не касается - сетевой фан-аут идёт отдельно"""
+        game_exe = self._find_best_exe(item)
+        if not game_exe:
+            return None
+
+        # EXCLUSION CHECK (Exe)
+        if os.path.realpath(game_exe).lower() in excluded:
+            logger.info(f"Skipping excluded exe: {game_exe}")
+            return None
+
+        name = item.name  # Используем имя папки как название игры
+
+        # Clean name heuristic + cache check (мемоизировано по сырому имени)
+        cached = cover_manager.has_valid_cached(_title_cover_key(name))
+        icon = str(cached) if cached else None
+        return (name, game_exe, icon, item)
+
+    def scan_sync(self, cover_manager: 'CoverAPIManager', excluded_paths: List[str] = None, additional_paths: List[str] = None, known_installs: Dict[str, GameModel] = None) -> List[GameModel]:
         games = []
+        known_installs = known_installs or {}
         all_paths = additional_paths or []
         if not all_paths:
             logger.info("Нет папок для сканирования системных игр")
             return games
         logger.info(f"Сканирование системных игр в папках: {all_paths}")
-        
-        excluded = set(str(Path(p).resolve()).lower() for p in (excluded_paths or []))
+
+        excluded = set(os.path.realpath(p).lower() for p in (excluded_paths or []))
         scanned_folders = set()
-        
+
+        # Фаза 1 (дёшево, последовательно): собираем папки-кандидаты
+        candidates: List[Path] = []
         for root_path_str in all_paths:
-            root_path = Path(root_path_str)
-            if not root_path.exists():
+            if not os.path.exists(root_path_str):
                 continue
-                
+            # Канонизируем корень один раз: для несимлинковых подпапок
+            # канонический путь - просто join, без syscall на папку
+            root_real = os.path.realpath(root_path_str)
+
             try:
-                # Сканируем папки первого уровня (глубина 1)
+                # Сканируем папки первого уровня (глубина 1) одним
+                # scandir-проходом: тип записи приходит из листинга,
+                # без stat на каждый элемент как у iterdir+is_dir.
                 # Например в C:\Games лежат папки C:\Games\Doom, C:\Games\Quake
-                for item in root_path.iterdir():
-                    if item.is_dir():
-                        if item.name.lower() in self.IGNORE_DIRS:
-                            continue
-                            
-                        # Проверяем, не сканировали ли мы эту папку уже (symlinks etc)
-                        if item.resolve() in scanned_folders:
+                with os.scandir(root_path_str) as it:
+                    # mtime тоже берём из листинга - нужен фингерпринт-кэшу.
+                    # is_dir() с follow: junction/симлинк на папку с игрой
+                    # (типичный способ перенести библиотеку на другой
+                    # диск) обязан сканироваться; циклы гасит realpath
+                    # в scanned_folders ниже. Сама запись - ссылка ли
+                    # она - запоминается, чтобы обычным папкам не
+                    # платить за realpath
+                    subdirs = [(e.path, e.name, e.stat().st_mtime_ns,
+                                not e.is_dir(follow_symlinks=False)) for e in it
+                               if e.is_dir()
+                               and e.name.lower() not in self.IGNORE_DIRS]
+
+                for dir_path, dir_name, dir_mtime, is_link in subdirs:
+                    # Для обычной папки канонический путь - конкатенация
+                    # строк; realpath-syscall нужен только ссылкам
+                    if is_link:
+                        resolved = os.path.realpath(dir_path)
+                    else:
+                        resolved = os.path.join(root_real, dir_name)
+
+                    # Проверяем, не сканировали ли мы эту папку уже (symlinks etc)
+                    if resolved in scanned_folders:
+                        continue
+
+                    # EXCLUSION CHECK (Folder)
+                    if resolved.lower() in excluded:
+                        logger.info(f"Skipping excluded folder: {dir_path}")
+                        continue
+
+                    scanned_folders.add(resolved)
+
+                    # Быстрый путь: папка уже есть в библиотеке и её exe
+                    # на месте - возвращаем прошлую модель как есть, без
+                    # поиска exe и без API обложек. Перепроверка нужна
+                    # только для новых/изменившихся папок
+                    known = known_installs.get(dir_path)
+                    if known and os.path.exists(known.exe_path):
+                        # EXCLUSION CHECK (Exe) - как в _probe_folder:
+                        # исключение хранит путь exe, и mtime папки от
+                        # него не меняется, так что быстрый путь обязан
+                        # проверять его сам, иначе скрытая игра воскреснет
+                        if os.path.realpath(known.exe_path).lower() in excluded:
+                            logger.info(f"Skipping excluded exe: {known.exe_path}")
                             continue
-                        
-                        # EXCLUSION CHECK (Folder)
-                        if str(item.resolve()).lower() in excluded:
-                            logger.info(f"Skipping excluded folder: {item}")
+                        games.append(known)
+                        continue
+
+                    # Фингерпринт-кэш: mtime папки не изменился и exe
+                    # на месте - прошлый результат валиден, пробинг и
+                    # сетевые ярусы обложек не нужны
+                    cached = self._scan_cache.get(dir_path)
+                    if cached and cached[0] == dir_mtime and os.path.exists(cached[1]):
+                        exe_path, name = cached[1], cached[2]
+                        # EXCLUSION CHECK (Exe) - кэш-хит тоже обязан
+                        # уважать исключение по exe (см. известные
+                        # установки выше)
+                        if os.path.realpath(exe_path).lower() in excluded:
+                            logger.info(f"Skipping excluded exe: {exe_path}")
                             continue
-                        
-                        scanned_folders.add(item.resolve())
-                        
-                        # Пытаемся найти игру внутри этой папки
-                        game_exe = self._find_best_exe(item)
-                        if game_exe:
-                            # EXCLUSION CHECK (Exe)
-                            if str(game_exe.resolve()).lower() in excluded:
-                                logger.info(f"Skipping excluded exe: {game_exe}")
-                                continue
-
-                            name = item.name # Используем имя папки как название игры
-                            
-                            # Clean name heuristic
-                            clean_name = cover_manager.icon_extractor._clean_name(name)
-                            
-                            # Cache check
-                            cache_key = hashlib.md5(clean_name.encode()).hexdigest()[:12]
-                            cache_path = cover_manager.cache_dir / f"{cache_key}.jpg"
-                            
-                            if cache_path.exists() and cache_path.stat().st_size > 2048:
-                                icon = str(cache_path)
-                            else:
-                                icon, _ = cover_manager.get_cover(name, exe_path=str(game_exe)) # Unpack tuple
-                            
-                            logger.info(f"Найдена игра: {name} ({game_exe})")
-                            
-                            games.append(GameModel(
-                                uid=GameModel.generate_uid(str(game_exe)),
-                                title=name,
-                                exe_path=str(game_exe),
-                                icon_path=icon,
-                                platform=Platform.SYSTEM.value,
-                                install_path=str(item)
-                            ))
+                        cover = cover_manager.has_valid_cached(_title_cover_key(name))
+                        games.append(GameModel(
+                            uid=GameModel.generate_uid(exe_path),
+                            title=name,
+                            exe_path=exe_path,
+                            icon_path=str(cover) if cover else None,
+                            platform=Platform.SYSTEM.value,
+                            install_path=dir_path
+                        ))
+                        continue
+
+                    candidates.append((Path(dir_path), dir_mtime))
             except Exception as e:
-                logger.error(f"Ошибка при сканировании {root_path}: {e}")
-                
+                logger.error(f"Ошибка при сканировании {root_path_str}: {e}")
+
+        if not candidates:
+            return games
+
+        # Фаза 2: обход папок в пуле (латентность диска), и как только
+        # папка дала промах кэша обложки - её сетевой get_cover сразу
+        # уходит во второй пул. Сеть работает, пока диск ещё
+        # сканируется, вместо последовательных "сначала весь диск,
+        # потом вся сеть"
+        probed_by_idx: Dict[int, tuple] = {}
+        cover_futures = {}
+        icons: Dict[str, Optional[str]] = {}
+        with ThreadPoolExecutor(max_workers=8) as probe_pool, \
+                ThreadPoolExecutor(max_workers=10) as cover_pool:
+            probe_futures = {
+                probe_pool.submit(self._probe_folder, item, excluded,
+                                  cover_manager): idx
+                for idx, (item, _) in enumerate(candidates)
+            }
+            for future in as_completed(probe_futures):
+                idx = probe_futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Ошибка при обработке {candidates[idx][0]}: {e}")
+                    continue
+                if not result:
+                    continue
+                probed_by_idx[idx] = result
+                name, game_exe, icon, _ = result
+                if icon is None:
+                    cover_futures[cover_pool.submit(
+                        cover_manager.get_cover, name,
+                        exe_path=str(game_exe))] = str(game_exe)
+
+            for future in as_completed(cover_futures):
+                exe_key = cover_futures[future]
+                try:
+                    icon, _ = future.result()  # Unpack tuple
+                except Exception as e:
+                    logger.warning(f"Cover fetch failed for {exe_key}: {e}")
+                    icon = None
+                icons[exe_key] = icon
+
+        # Порядок игр - как при последовательном обходе
+        for idx in sorted(probed_by_idx):
+            name, game_exe, icon, item = probed_by_idx[idx]
+            if icon is None:
+                icon = icons.get(str(game_exe))
+            logger.info(f"Найдена игра: {name} ({game_exe})")
+            games.append(GameModel(
+                uid=GameModel.generate_uid(str(game_exe)),
+                title=name,
+                exe_path=str(game_exe),
+                icon_path=icon,
+                platform=Platform.SYSTEM.value,
+                install_path=str(item)
+            ))
+            # Запоминаем фингерпринт для следующего рескана
+            self._scan_cache[str(item)] = [candidates[idx][1], str(game_exe), name]
+
+        if probed_by_idx:
+            self._save_scan_cache()
+
         return games
 
 
@@ -1052,6 +2014,7 @@ class GameManager:
         self.cover_validator = CoverValidator(cache_icons, self.library_file)
         self.cover_api_manager = CoverAPIManager(cache_icons, sgdb_key, rawg_key)
         self.cover_uploader = CoverUploader(cache_icons)
+        self.thumb_cache = ThumbnailCache(Path(cache_dir) / "thumbs")
 
         # Backward compatibility: expose icon_extractor
         self.icon_extractor = self.cover_api_manager.icon_extractor
@@ -1061,6 +2024,13 @@ class GameManager:
         self._games: Dict[str, GameModel] = {}
         self._collections: List[Dict[str, Any]] = []  # Пользовательские коллекции
         self._on_progress = None
+        self._save_task: Optional[asyncio.Task] = None
+        # Инвертированные индексы для фильтров UI: запрос по платформе
+        # или избранному - O(совпадений), а не проход по всем играм.
+        # Dict вместо set, чтобы сохранить порядок вставки (фильтр
+        # "default" показывает игры без сортировки)
+        self._by_platform: Dict[str, Dict[str, None]] = {}
+        self._favorites: Dict[str, None] = {}
 
     def reinitialize_api_clients(self, sgdb_key: str = None, rawg_key: str = None):
         """Reinitialize API clients with new keys."""
@@ -1075,17 +2045,30 @@ class GameManager:
     async def load_library(self):
         if self.library_file.exists():
             try:
-                with open(self.library_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for g in data.get('games', []):
-                        # Ensure collections field exists for backward compatibility
-                        if 'collections' not in g:
-                            g['collections'] = []
-                        self._games[g['uid']] = GameModel.from_dict(g)
+                # Бинарное чтение: orjson принимает bytes напрямую,
+                # без отдельного UTF-8 декода всего файла
+                with open(self.library_file, 'rb') as f:
+                    data = _jloads(f.read())
+                    if HAS_MSGSPEC:
+                        # Один C-проход по всему списку вместо вызова
+                        # from_dict на каждую игру; отсутствующие поля
+                        # (collections в старых библиотеках) добивают
+                        # дефолты dataclass
+                        for game in msgspec.convert(
+                                data.get('games', []), type=List[GameModel]):
+                            self._games[game.uid] = game
+                    else:
+                        for g in data.get('games', []):
+                            # Ensure collections field exists for backward compatibility
+                            if 'collections' not in g:
+                                g['collections'] = []
+                            self._games[g['uid']] = GameModel.from_dict(g)
 
                     # Загрузка коллекций
                     self._collections = data.get('collections', [])
 
+                self._reindex()
+
                 # Validate and repair cache references
                 games_list = list(self._games.values())
                 repaired = self.cover_validator.repair_library_references(games_list)
@@ -1106,12 +2089,43 @@ class GameManager:
                 logger.error(f"Load library error: {e}")
 
     async def save_library(self):
+        # Файловый I/O блокирующий - уводим запись с событийного цикла,
+        # чтобы сохранение библиотеки не подвешивало UI
+        await asyncio.to_thread(self._write_library_sync)
+
+    def _write_library_sync(self):
         data = {
             'games': [g.to_dict() for g in self._games.values()],
             'collections': self._collections
         }
-        with open(self.library_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Пишем во временный файл и атомарно подменяем: упавшая на
+        # середине запись не оставит library.json обрезанным
+        tmp = self.library_file.with_suffix('.json.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(_jdumpb(data, indent=True))
+        os.replace(tmp, self.library_file)
+
+    def save_library_soon(self, delay: float = 0.5):
+        """Отложенное сохранение: серия быстрых изменений (например,
+        несколько кликов по избранному подряд) схлопывается в одну
+        запись на диск"""
+        if self._save_task and not self._save_task.done():
+            self._save_task.cancel()
+
+        async def _delayed():
+            await asyncio.sleep(delay)
+            await self.save_library()
+
+        self._save_task = asyncio.get_running_loop().create_task(_delayed())
+
+    def flush_pending_save(self):
+        """Финальный сброс при выходе: если отложенное сохранение ещё
+        не успело сработать, пишем библиотеку синхронно прямо сейчас -
+        event loop после sys.exit управления уже не получит"""
+        task = self._save_task
+        if task and not task.done():
+            task.cancel()
+            self._write_library_sync()
 
     
     # Standard paths for launchers
@@ -1123,6 +2137,11 @@ class GameManager:
     }
 
     async def scan_all_games(self, excluded_paths: List[str] = None, additional_paths: List[str] = None, enabled_launchers: dict = None):
+        # Сканирование сознательно живёт в пуле потоков, а не процессов:
+        # фазы упираются в диск (scandir/stat/чтение манифестов), и на
+        # I/O GIL отпускается, так что потоки масштабируются. Разбор
+        # ACF/JSON - микросекунды на файл и не окупает ни pickle-обмен,
+        # ни прогрев кэшей сканеров в каждом воркер-процессе
         logger.info("scan_all_games called")
         if self._on_progress:
             self._on_progress("Проверка удалённых игр...", 0, 100)
@@ -1134,30 +2153,38 @@ class GameManager:
         # ИСПРАВЛЕНИЕ: Удаляем игры, которых больше нет на диске
         # Выполняем синхронные проверки IO в отдельном потоке, чтобы не блокировать UI
         def _check_removed_games_sync():
-            to_remove = []
-            for uid, game in self._games.items():
-                # Для Steam игр проверяем install_path (папку установки)
-                if game.exe_path.startswith("steam://"):
-                    # Проверяем существует ли папка установки
-                    if game.install_path and not Path(game.install_path).exists():
-                        to_remove.append(uid)
-                        logger.info(f"Steam игра удалена с диска: {game.title} ({game.install_path})")
-                else:
-                    # Для системных игр проверяем exe файл
-                    if not Path(game.exe_path).exists():
-                        to_remove.append(uid)
-                        logger.info(f"Игра удалена с диска: {game.title}")
+            # Одна stat-проверка на игру: для Steam - папка установки,
+            # для системных - exe. os.path.exists по строке вместо
+            # Path(...).exists() - без аллокации и разбора PurePath,
+            # а пул потоков перекрывает дисковые задержки проверок
+            to_check = [
+                (uid, g.install_path if g.exe_path.startswith("steam://") else g.exe_path)
+                for uid, g in self._games.items()
+                if not g.exe_path.startswith("steam://") or g.install_path
+            ]
+            if not to_check:
+                return set()
+            to_remove = set()
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                for (uid, path), found in zip(to_check, pool.map(os.path.exists, (p for _, p in to_check))):
+                    if not found:
+                        to_remove.add(uid)
+                        logger.info(f"Игра удалена с диска: {self._games[uid].title} ({path})")
             return to_remove
 
         games_to_remove = await asyncio.to_thread(_check_removed_games_sync)
-        
-        # Удаляем из библиотеки
-        for uid in games_to_remove:
-            del self._games[uid]
-        
+
+        # Пересобираем словарь одним проходом вместо поштучных del
         if games_to_remove:
+            self._games = {u: g for u, g in self._games.items()
+                           if u not in games_to_remove}
+            self._reindex()
             logger.info(f"Удалено {len(games_to_remove)} игр из библиотеки")
         
+        # Снимок папки кэша обложек: пре-чеки сканеров дальше идут
+        # по словарю, без stat на каждую игру
+        self.cover_api_manager.refresh_cache_index()
+
         steam_games = []
         if enabled_launchers.get("Steam", True):
             if self._on_progress:
@@ -1189,7 +2216,13 @@ class GameManager:
 
         # Сканируем все собранные пути
         if all_scan_paths:
-            system_games = await self.disk_scanner.scan(self.cover_api_manager, excluded_paths, additional_paths=all_scan_paths)
+            # Уже известные системные игры передаём сканеру: их папки
+            # не перепроверяются, пока exe на месте
+            known_installs = {
+                g.install_path: g for g in self._games.values()
+                if g.platform == Platform.SYSTEM.value and g.install_path
+            }
+            system_games = await self.disk_scanner.scan(self.cover_api_manager, excluded_paths, additional_paths=all_scan_paths, known_installs=known_installs)
 
         logger.info(f"Disk scan finished. Found {len(system_games)} system games.")
 
@@ -1214,30 +2247,63 @@ class GameManager:
 
         # Заменяем библиотеку
         self._games = new_games_dict
+        self._reindex()
         logger.info(f"Library updated. Total games: {len(self._games)}")
 
         await self.save_library()
         if self._on_progress:
             self._on_progress("Готово!", 100, 100)
 
+    def _reindex(self):
+        """Перестраивает индексы после массовой замены self._games"""
+        self._by_platform = {}
+        self._favorites = {}
+        for uid, g in self._games.items():
+            self._by_platform.setdefault(g.platform, {})[uid] = None
+            if g.is_favorite:
+                self._favorites[uid] = None
+
+    def _index_remove(self, uid: str, game: GameModel):
+        self._by_platform.get(game.platform, {}).pop(uid, None)
+        self._favorites.pop(uid, None)
+
+    def build_thumbnails(self) -> Dict[str, str]:
+        """Миниатюры для всех иконок библиотеки: {icon_path: thumb_path}.
+        Синхронный и потокобезопасный - UI зовёт через to_thread"""
+        return self.thumb_cache.build_all(
+            [g.icon_path for g in self._games.values() if g.icon_path])
+
     def get_all_games(self): return list(self._games.values())
-    def get_games_by_category(self, cat): return [g for g in self._games.values() if g.is_favorite] if cat == Category.FAVORITES.value else self.get_all_games()
-    def get_games_by_platform(self, plat): return [g for g in self._games.values() if g.platform == plat]
+    def get_games_by_category(self, cat): return [self._games[u] for u in self._favorites] if cat == Category.FAVORITES.value else self.get_all_games()
+    def get_games_by_platform(self, plat): return [self._games[u] for u in self._by_platform.get(plat, ())]
     
     async def launch_game(self, uid):
         if uid in self._games:
             game = self._games[uid]
             try:
-                if game.exe_path.startswith("steam://"): os.startfile(game.exe_path)
-                else: subprocess.Popen(game.exe_path, cwd=game.install_path, shell=True)
+                if game.exe_path.startswith("steam://"):
+                    os.startfile(game.exe_path)
+                else:
+                    # Без shell=True: не плодим cmd.exe-посредника и не
+                    # зависим от shell-квотинга путей с пробелами.
+                    # DETACHED_PROCESS: игра живёт независимо от лаунчера
+                    subprocess.Popen(
+                        [game.exe_path], cwd=game.install_path,
+                        creationflags=getattr(subprocess, "DETACHED_PROCESS", 0)
+                        | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0))
                 return True
             except: return False
         return False
 
     async def toggle_favorite(self, uid):
         if uid in self._games:
-            self._games[uid].is_favorite = not self._games[uid].is_favorite
-            await self.save_library()
+            game = self._games[uid]
+            game.is_favorite = not game.is_favorite
+            if game.is_favorite:
+                self._favorites[uid] = None
+            else:
+                self._favorites.pop(uid, None)
+            self.save_library_soon()
 
     @property
     def games_count(self) -> int:
@@ -1249,6 +2315,7 @@ class GameManager:
             game = self._games[uid]
             path = game.exe_path or game.install_path
             del self._games[uid]
+            self._index_remove(uid, game)
             await self.save_library()
             logger.info(f"Excluded game: {game.title} (path: {path})")
             return path
@@ -1353,10 +2420,10 @@ class GameManager:
         
         # Try to find icon in cache or extract new
         icon = None
-        cache_key = hashlib.md5(name.encode()).hexdigest()[:12]
-        cache_path = self.cover_api_manager.cache_dir / f"{cache_key}.jpg"
-        
-        if cache_path.exists():
+        cover_key = _title_cover_key(name)
+        cache_path = self.cover_api_manager.cache_path_for(cover_key)
+
+        if self.cover_api_manager.has_valid_cached(cover_key):
              icon = str(cache_path)
         else:
              # Try to extract icon since we are restoring
@@ -1376,6 +2443,7 @@ class GameManager:
         )
         
         self._games[uid] = game
+        self._by_platform.setdefault(game.platform, {})[uid] = None
         await self.save_library()
         logger.info(f"Restored game: {game.title}")
         return game
\ No newline at end of file
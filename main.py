@@ -1,5 +1,8 @@
 import flet as ft
 import asyncio
+import atexit
+import functools
+import time
 import sys
 import json
 import re
@@ -7,6 +10,8 @@ import logging
 import threading
 import webbrowser
 import os
+from collections import OrderedDict
+from operator import attrgetter
 from pathlib import Path
 from tkinter import Tk, filedialog
 
@@ -23,8 +28,9 @@ try:
 except ImportError:
     HAS_TRAY = False
 
-# Импорт backend
-from game_manager import GameManager, GameModel, Platform, Category, logger as backend_logger
+# Импорт backend. _jloads/_jdumpb - общие JSON-хелперы (orjson с
+# фолбэком на stdlib), чтобы не дублировать опциональный импорт здесь
+from game_manager import GameManager, GameModel, Platform, Category, logger as backend_logger, _jloads, _jdumpb
 
 # --- SINGLE INSTANCE LOCK ---
 LOCK_FILE = None
@@ -114,6 +120,11 @@ def create_tray_icon():
 
     def on_exit(icon, item):
         """Выход из приложения"""
+        try:
+            if TRAY_APP_INSTANCE and TRAY_APP_INSTANCE.game_manager:
+                TRAY_APP_INSTANCE.game_manager.flush_pending_save()
+        except Exception:
+            pass
         icon.stop()
         release_single_instance_lock()
         os._exit(0)
@@ -140,6 +151,27 @@ def stop_tray_icon():
         TRAY_ICON.stop()
 
 logger = logging.getLogger("MainUI")
+# WARNING по умолчанию: debug-записи горячих обработчиков кликов
+# отфильтровываются ещё до форматирования строки
+logger.setLevel(logging.WARNING)
+
+# Файл низкоуровневой отладки кликов: один буферизованный хендл на
+# процесс вместо open/write/close на каждое нажатие. Открывается
+# лениво - пока _debug не вызван, файл не создаётся
+_DEBUG_FH = None
+_DEBUG_LOCK = threading.Lock()
+
+
+def _debug(msg: str, flush: bool = False):
+    global _DEBUG_FH
+    with _DEBUG_LOCK:
+        if _DEBUG_FH is None:
+            _DEBUG_FH = open("debug_click.txt", "ab", buffering=1 << 16)
+            atexit.register(_DEBUG_FH.close)
+        _DEBUG_FH.write(msg.encode("utf-8") + b"\n")
+        if flush:
+            # Ошибки доезжают до диска сразу, не ждут заполнения буфера
+            _DEBUG_FH.flush()
 
 # --- КОНФИГУРАЦИЯ ЦВЕТОВ И СТИЛЯ ---
 BG_COLOR = "#0F0F0F"
@@ -202,6 +234,18 @@ GRADIENT_THEMES = {
     },
 }
 
+# Объекты градиентов строятся один раз на тему при импорте: это
+# неизменяемые спецификации (как DecorationImage у карточек), их можно
+# разделять между контролами вместо аллокации на каждую перерисовку
+for _td in GRADIENT_THEMES.values():
+    _td["_bg_gradient"] = ft.LinearGradient(
+        begin=ft.Alignment(-1, -1), end=ft.Alignment(1, 1),
+        colors=_td["colors"])
+    _td["_preview_gradient"] = ft.LinearGradient(
+        begin=ft.Alignment(-1, -1), end=ft.Alignment(1, 1),
+        colors=_td["preview"])
+del _td
+
 
 class SidebarButton(ft.Container):
     """Кнопка боковой панели с эффектом подсветки"""
@@ -246,8 +290,12 @@ class SidebarButton(ft.Container):
         if self._on_click_handler:
             self._on_click_handler(self.button_data)
     
-    def set_active(self, active: bool, skip_update: bool = True):
-        """Set active state - skip_update=True for batch updates"""
+    def set_active(self, active: bool):
+        """Выставляет активное состояние, только помечая контрол.
+
+        Намеренно без self.update(): on_filter_click переключает весь
+        ряд кнопок и закрывает пачку одним page.update() - отдельный
+        диф на каждую кнопку был бы N лишних кадров на клик."""
         if self.is_active == active:
             return  # No change needed
         self.is_active = active
@@ -256,16 +304,86 @@ class SidebarButton(ft.Container):
         self.content.controls[1].color = TEXT_WHITE if active else TEXT_GREY
         text_control = self.content.controls[1]
         text_control.weight = ft.FontWeight.W_600 if active else ft.FontWeight.NORMAL
-        # Don't call self.update() - let caller do page.update() once
+
+
+# Пока грид прокручивается, ховер-анимации карточек глушатся: во время
+# скролла курсор цепляет карточки одну за другой, и каждая реакция -
+# лишний кадр. Флаг ставит обработчик скролла и сбрасывает через 150мс
+_SCROLLING = False
+
+# Варианты "истины" в e.data ховер-событий (flet шлёт строку): одна
+# проверка членства вместо цепочки сравнений на каждом движении мыши
+_HOVER_TRUTHY = frozenset({True, "true", "True", 1})
+
+# Кнопки-фильтры сайдбара: (ключ, иконка, подпись, активна при старте).
+# build_ui создаёт их одним проходом по этому списку
+_SIDEBAR_SPEC = [
+    ("all", ft.Icons.GRID_VIEW_ROUNDED, "Все игры", True),
+    ("favorites", ft.Icons.FAVORITE_BORDER, "Избранное", False),
+    ("steam", ft.Icons.VIDEOGAME_ASSET_OUTLINED, "Steam", False),
+    ("epic", ft.Icons.TOKEN_OUTLINED, "Epic Games", False),
+    ("system", ft.Icons.COMPUTER_OUTLINED, "Системные", False),
+    ("settings", ft.Icons.SETTINGS_OUTLINED, "Настройки", False),
+    ("disk_info", ft.Icons.STORAGE_OUTLINED, "Диски", False),
+]
+
+# Цвета бейджей платформ - один словарь на модуль, а не на карточку
+_PLATFORM_COLORS = {
+    Platform.STEAM.value: "#1B2838",
+    Platform.EPIC.value: "#2A2A2A",
+    Platform.SYSTEM.value: "#0078D4",
+}
+
+
+# Паттерны очистки названий от тегов репаков: компилируются один раз
+# на модуль, а не на каждую карточку
+_RE_BRACKETS = re.compile(r'\s*\[[^\]]*\]\s*')
+_RE_BUILD = re.compile(r'\.?Build\.?\d+', re.IGNORECASE)
+_RE_VERSION = re.compile(r'\s*v?\d+\.\d+(\.\d+)*\s*$', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=2048)
+def _clean_title(title: str) -> str:
+    """Очистка названия от тегов репаков. Названия повторяются при
+    каждом перерендере грида - результат мемоизируется"""
+    if not title:
+        return "Unknown Game"
+    title = _RE_BRACKETS.sub(' ', title)
+    title = _RE_BUILD.sub('', title)
+    title = _RE_VERSION.sub('', title)
+    title = ' '.join(title.split())
+    return title.strip() or "Unknown Game"
+
+
+def _open_tk_dialog(opener, **kwargs):
+    """Открывает нативный tkinter-диалог через скрытое окно.
+
+    Tk крутит собственный mainloop и блокирует поток - вызывать только
+    из пула потоков (asyncio.to_thread), не из событийного цикла flet.
+    """
+    try:
+        root = Tk()
+        root.withdraw()
+        root.attributes('-topmost', True)
+        try:
+            return opener(**kwargs)
+        finally:
+            root.destroy()
+    except Exception as ex:
+        print(f"[ERROR] Tk dialog error: {ex}")
+        return ""
 
 
 class GameCard(ft.Container):
     """Карточка игры с иконкой на весь фон - ОПТИМИЗИРОВАНО"""
 
-    # Class-level cache for icon existence checks
-    _icon_exists_cache = {}
+    # DecorationImage - не контрол, а описание декорации, поэтому один
+    # экземпляр на icon_path можно отдавать всем карточкам и
+    # перерендерам: рендерер видит тот же спек и не перезапускает
+    # декодирование картинки
+    _bg_image_cache: dict = {}
 
-    def __init__(self, game: GameModel, on_click=None, on_favorite=None, on_upload=None, on_exclude=None, on_collection=None, show_size=False, enable_animations=False):
+    def __init__(self, game: GameModel, on_click=None, on_favorite=None, on_upload=None, on_exclude=None, on_collection=None, show_size=False, enable_animations=False, existing_icons=None, thumb_map=None):
         super().__init__()
         self.game = game
         self._on_click = on_click
@@ -292,26 +410,26 @@ class GameCard(ft.Container):
         self.scale = 1.0
         self.border = ft.Border.all(1, "#333333")
         
-        # Cache icon existence check
+        # Существование иконки: O(1) по пре-скану папок кэша вместо
+        # stat на каждую карточку (см. CyberLauncher._prescan_icons)
         icon_src = None
         has_icon = False
         if game.icon_path:
-            if game.icon_path in GameCard._icon_exists_cache:
-                has_icon = GameCard._icon_exists_cache[game.icon_path]
+            if existing_icons is not None:
+                has_icon = game.icon_path in existing_icons
             else:
-                has_icon = Path(game.icon_path).exists()
-                GameCard._icon_exists_cache[game.icon_path] = has_icon
+                has_icon = os.path.exists(game.icon_path)
             if has_icon:
                 icon_src = game.icon_path
+                # Миниатюра вместо полноразмерной обложки, если готова
+                if thumb_map:
+                    icon_src = thumb_map.get(icon_src, icon_src)
 
         # Бейдж платформы
-        platform_colors = {
-            Platform.STEAM.value: "#1B2838",
-            Platform.EPIC.value: "#2A2A2A", 
-            Platform.SYSTEM.value: "#0078D4",
-        }
-        platform_color = platform_colors.get(game.platform, "#333333")
+        platform_color = _PLATFORM_COLORS.get(game.platform, "#333333")
         
+        # Позиционирование в Stack задаётся прямо на контроле -
+        # обёртки-контейнеры ради left/top не нужны
         platform_badge = ft.Container(
             content=ft.Text(
                 game.platform,
@@ -322,18 +440,24 @@ class GameCard(ft.Container):
             bgcolor=platform_color,
             padding=ft.Padding(left=10, right=10, top=5, bottom=5),
             border_radius=10,
+            left=10,
+            top=10,
         )
         
         # ============================================================
         # ИСПРАВЛЕНИЕ: Используем строку "cover" вместо ft.ImageFit.COVER
         # ============================================================
         if has_icon:
-            background = ft.Container(
-                expand=True,
-                image=ft.DecorationImage(
+            bg_image = GameCard._bg_image_cache.get(icon_src)
+            if bg_image is None:
+                bg_image = ft.DecorationImage(
                     src=icon_src,
                     fit="cover",  # <-- ИСПРАВЛЕНО ЗДЕСЬ
-                ),
+                )
+                GameCard._bg_image_cache[icon_src] = bg_image
+            background = ft.Container(
+                expand=True,
+                image=bg_image,
             )
         else:
             # Заглушка если нет иконки
@@ -353,7 +477,7 @@ class GameCard(ft.Container):
             )
         
         # Название игры
-        display_title = self._clean_title(game.title)
+        display_title = _clean_title(game.title)
         
         game_title = ft.Text(
             display_title,
@@ -362,6 +486,9 @@ class GameCard(ft.Container):
             color="#FFFFFF",
             max_lines=2,
             overflow=ft.TextOverflow.ELLIPSIS,
+            left=12,
+            right=12,
+            bottom=12,
         )
         
         # Размер игры
@@ -379,15 +506,55 @@ class GameCard(ft.Container):
                     bgcolor="#80000000",
                     padding=ft.Padding(left=8, right=8, top=4, bottom=4),
                     border_radius=8,
+                    left=10,
+                    bottom=40,
                 )
         
-        # Собираем Stack - УПРОЩЁННАЯ СТРУКТУРА
-        # Кликабельные кнопки используют Container с on_click напрямую
+        # Кнопки действий: одна позиционированная колонка вместо
+        # четырёх абсолютных контейнеров (тот же шаг 36px + 8px)
+        def action_button(icon, icon_color, icon_size, bg, handler):
+            return ft.Container(
+                content=ft.Icon(icon, color=icon_color, size=icon_size),
+                width=36,
+                height=36,
+                border_radius=18,
+                bgcolor=bg,
+                alignment=ft.Alignment(0, 0),
+                on_click=handler,
+                ink=True,
+            )
+
+        actions = ft.Column(
+            controls=[
+                # Избранное
+                action_button(
+                    ft.Icons.FAVORITE if game.is_favorite else ft.Icons.FAVORITE_BORDER,
+                    "#FF4081" if game.is_favorite else "#FFFFFF",
+                    20, "#80000000", self.on_favorite_click),
+                # Загрузка обложки
+                action_button(ft.Icons.IMAGE_SEARCH, "#FFFFFF", 18,
+                              "#8000E5FF", self.on_upload_click),
+                # Добавить в коллекцию
+                action_button(
+                    ft.Icons.FOLDER_SPECIAL if game.collections else ft.Icons.FOLDER_OUTLINED,
+                    "#FFD54F" if game.collections else "#FFFFFF",
+                    18, "#80D500F9", self.on_collection_click),
+                # Скрыть программу из библиотеки
+                action_button(ft.Icons.BLOCK, "#FFFFFF", 18,
+                              "#80F44336", self.on_exclude_click),
+            ],
+            spacing=8,
+            right=8,
+            top=8,
+        )
+
+        # Собираем Stack - минимум узлов: градиент затемнения и
+        # кликабельная область запуска - один и тот же контейнер
         stack_controls = [
             # 1. Фон с изображением
             background,
-            
-            # 2. Градиент затемнения снизу
+
+            # 2. Градиент затемнения снизу + клик для запуска игры
             ft.Container(
                 expand=True,
                 gradient=ft.LinearGradient(
@@ -396,126 +563,27 @@ class GameCard(ft.Container):
                     colors=["#00000000", "#00000000", "#CC000000"],
                     stops=[0.0, 0.5, 1.0],
                 ),
-            ),
-            
-            # 3. Кликабельная область для запуска игры
-            ft.Container(
-                expand=True,
                 on_click=self.on_card_click,
             ),
-            
-            # 4. Бейдж платформы
-            ft.Container(
-                content=platform_badge,
-                left=10,
-                top=10,
-            ),
-
-            # 5. Название
-            ft.Container(
-                content=game_title,
-                left=12,
-                right=12,
-                bottom=12,
-            ),
-            
-            # 5. Кнопка избранного - ПРОСТОЙ Container с on_click
-            ft.Container(
-                content=ft.Icon(
-                    ft.Icons.FAVORITE if game.is_favorite else ft.Icons.FAVORITE_BORDER,
-                    color="#FF4081" if game.is_favorite else "#FFFFFF",
-                    size=20,
-                ),
-                width=36,
-                height=36,
-                border_radius=18,
-                bgcolor="#80000000",
-                alignment=ft.Alignment(0, 0),
-                right=8,
-                top=8,
-                on_click=self.on_favorite_click,
-                ink=True,
-            ),
 
-            # 6. Кнопка загрузки обложки - ПРОСТОЙ Container с on_click
-            ft.Container(
-                content=ft.Icon(
-                    ft.Icons.IMAGE_SEARCH,
-                    color="#FFFFFF",
-                    size=18,
-                ),
-                width=36,
-                height=36,
-                border_radius=18,
-                bgcolor="#8000E5FF",
-                alignment=ft.Alignment(0, 0),
-                right=8,
-                top=52,
-                on_click=self.on_upload_click,
-                ink=True,
-            ),
+            # 3. Бейдж платформы
+            platform_badge,
 
-            # 7. Кнопка коллекции - добавить в коллекцию
-            ft.Container(
-                content=ft.Icon(
-                    ft.Icons.FOLDER_SPECIAL if game.collections else ft.Icons.FOLDER_OUTLINED,
-                    color="#FFFFFF" if not game.collections else "#FFD54F",
-                    size=18,
-                ),
-                width=36,
-                height=36,
-                border_radius=18,
-                bgcolor="#80D500F9",
-                alignment=ft.Alignment(0, 0),
-                right=8,
-                top=96,
-                on_click=self.on_collection_click,
-                ink=True,
-            ),
+            # 4. Название
+            game_title,
 
-            # 8. Кнопка исключения - скрыть программу из библиотеки
-            ft.Container(
-                content=ft.Icon(
-                    ft.Icons.BLOCK,
-                    color="#FFFFFF",
-                    size=18,
-                ),
-                width=36,
-                height=36,
-                border_radius=18,
-                bgcolor="#80F44336",
-                alignment=ft.Alignment(0, 0),
-                right=8,
-                top=140,
-                on_click=self.on_exclude_click,
-                ink=True,
-            ),
+            # 5. Кнопки действий
+            actions,
         ]
-        
+
         if size_badge:
-            stack_controls.append(
-                ft.Container(
-                    content=size_badge,
-                    left=10,
-                    bottom=40,
-                )
-            )
-        
+            stack_controls.append(size_badge)
+
         self.content = ft.Stack(
             controls=stack_controls,
             expand=True,
         )
     
-    def _clean_title(self, title: str) -> str:
-        """Очистка названия от тегов репаков"""
-        if not title:
-            return "Unknown Game"
-        title = re.sub(r'\s*\[[^\]]*\]\s*', ' ', title)
-        title = re.sub(r'\.?Build\.?\d+', '', title, flags=re.IGNORECASE)
-        title = re.sub(r'\s*v?\d+\.\d+(\.\d+)*\s*$', '', title, flags=re.IGNORECASE)
-        title = ' '.join(title.split())
-        return title.strip() or "Unknown Game"
-    
     def get_folder_size(self, path: str) -> str:
         """Получить размер папки - ОПТИМИЗАЦИЯ: отключено для производительности"""
         # Расчёт размера папки очень медленный для больших игр
@@ -523,14 +591,14 @@ class GameCard(ft.Container):
         return None
 
     def on_card_hover(self, e):
-        # Skip if animations disabled
-        if not self._enable_animations:
+        # Skip if animations disabled or while the grid is scrolling
+        if not self._enable_animations or _SCROLLING:
             return
         
-        is_hovering = e.data == True or e.data == "true"
-        
+        is_hovering = e.data in _HOVER_TRUTHY
+
         # Skip if state hasn't changed
-        if is_hovering == self._is_hovered:
+        if is_hovering is self._is_hovered:
             return
         
         self._is_hovered = is_hovering
@@ -548,26 +616,29 @@ class GameCard(ft.Container):
         if self._on_click:
             self._on_click(self.game)
     
+    # В обработчиках кликов - logger.debug вместо print: print держит
+    # лок stdout и флашит при каждом вызове, что во frozen-сборке со
+    # скрытой консолью стоит миллисекунды на клик
     def on_favorite_click(self, e):
-        print(f"[DEBUG] Favorite button clicked for: {self.game.title}")
+        logger.debug("Favorite clicked: %s", self.game.title)
         if self._on_favorite:
             self._on_favorite(self.game)
 
     def on_upload_click(self, e):
-        print(f"[DEBUG] Upload button clicked for: {self.game.title}")
+        logger.debug("Upload clicked: %s", self.game.title)
         if self._on_upload:
-            print(f"[DEBUG] Calling _on_upload callback...")
             self._on_upload(self.game)
         else:
-            print(f"[DEBUG] ERROR: _on_upload is None!")
+            logger.warning("Upload clicked but no _on_upload callback: %s",
+                           self.game.title)
 
     def on_exclude_click(self, e):
-        print(f"[DEBUG] Exclude button clicked for: {self.game.title}")
+        logger.debug("Exclude clicked: %s", self.game.title)
         if self._on_exclude:
             self._on_exclude(self.game)
 
     def on_collection_click(self, e):
-        print(f"[DEBUG] Collection button clicked for: {self.game.title}")
+        logger.debug("Collection clicked: %s", self.game.title)
         if self._on_collection:
             self._on_collection(self.game)
 
@@ -608,16 +679,25 @@ class LoadingOverlay(ft.Container):
         )
         
         self.alignment = ft.Alignment(0, 0)
-    
+        # Троттлинг прогресса: частые тики сканера не превращаются
+        # в шторм кадров
+        self._last_update_ts = 0.0
+
     def show(self, message: str = "Загрузка..."):
         self.progress_text.value = message
         self.progress_bar.value = None
         self.visible = True
         self.update()
-    
+
     def update_progress(self, message: str, current: int, total: int):
         self.progress_text.value = message
         self.progress_bar.value = current / total if total > 0 else None
+        # Рендереру уходит не больше ~30 кадров/с; финальный тик
+        # (current == total) доходит всегда
+        now = time.monotonic()
+        if current < total and now - self._last_update_ts < 0.033:
+            return
+        self._last_update_ts = now
         self.update()
     
     def hide(self):
@@ -637,16 +717,10 @@ class CyberLauncher:
         self.settings = self.load_settings()
         self.current_theme = self.settings.get("theme", "dark")
 
-        # Extract API keys from settings
-        api_keys = self.settings.get("api_keys", {})
-        sgdb_key = api_keys.get("steamgriddb") or None
-        rawg_key = api_keys.get("rawg") or None
-
-        # Initialize GameManager with API keys
-        self.game_manager = GameManager(
-            sgdb_key=sgdb_key,
-            rawg_key=rawg_key
-        )
+        # GameManager создаётся в _async_init: его конструктор делает
+        # mkdir'ы и читает кэши сканеров с диска, а первый кадр должен
+        # появиться сразу
+        self.game_manager = None
 
         self.current_filter = "all"
         self.sidebar_buttons: dict[str, SidebarButton] = {}
@@ -656,16 +730,68 @@ class CyberLauncher:
         self.games_count_text = None
         self.content_area = None
         
-        # Кеш карточек для оптимизации производительности
-        self._card_cache: dict[str, GameCard] = {}
+        # Кеш карточек для оптимизации производительности.
+        # Ограничен: при больших библиотеках невидимые карточки
+        # вытесняются, а не копятся до O(N) тяжёлых Stack'ов
+        self._card_cache: OrderedDict[str, GameCard] = OrderedDict()
+        self._card_cache_limit = 64
+        # uid -> позиция карточки в game_grid.controls: точечная замена
+        # одной карточки (избранное) без пересборки всего грида
+        self._card_index: dict[str, int] = {}
+
+        # Не больше 4 одновременных походов к API обложек: массовое
+        # обновление не душит сеть и не ловит 429 от рейт-лимитов
+        self._cover_fetch_sem = asyncio.Semaphore(4)
         
         # Пагинация для оптимизации с большими библиотеками
         self._page_size = 12  # Уменьшено для скорости
         self._current_page = 0  # Текущая страница (начиная с 0)
         self._all_games_list = []  # Полный список игр для пагинации
+
+        # Кэш отсортированных представлений текущей выборки по режиму
+        # сортировки: переключение режима не повторяет O(N log N)
+        self._sorted_lists: dict[str, list] = {}
+        self._sorted_base_ids: list[str] = []
         
-        # Для загрузки обложек (tkinter file dialog)
+        # Для загрузки обложек: цель и пул диалога (строится лениво
+        # один раз, см. _build_upload_dialog)
         self.upload_target_game = None
+        self.upload_dialog = None
+
+        # Флаг отложенной перерисовки: несколько запросов в рамках
+        # одного действия схлопываются в один page.update()
+        self._update_pending = False
+
+        # Событие для одиночного потребителя перестроек грида: шквал
+        # кликов по фильтрам/сортировке даёт одну перестройку
+        self._rebuild_event = asyncio.Event()
+
+        # Состояние подавления ховера на время прокрутки грида
+        self._last_scroll = 0.0
+        self._scroll_reset_pending = False
+
+        # Троттлинг полного page.update() из колбэка прогресса скана
+        self._last_progress_update = 0.0
+
+        # Дебаунс-задача отложенной записи настроек (save_settings_soon)
+        self._save_settings_task = None
+
+        # {icon_path: thumb_path} - карточки берут лёгкие миниатюры
+        # вместо полноразмерных обложек
+        self._thumb_map: dict[str, str] = {}
+
+        # Кэш дерева вкладки настроек (см. build_settings_view)
+        self._settings_view_cache = None
+
+        # Флаги рендера карточек - атрибуты, а не dict.get на каждую
+        # перерисовку; меняются только обработчиками тумблеров вместе
+        # с инвалидацией кэша карточек
+        self._show_size = self.settings.get("show_game_size", False)
+        self._animations_enabled = self.settings.get("enable_animations", False)
+
+        # Диспетчеризация фильтров - заполняется в _async_init, когда
+        # появляется game_manager
+        self._filter_dispatch: dict = {}
 
         self.setup_page()
         self.build_ui()
@@ -674,28 +800,62 @@ class CyberLauncher:
         try:
             settings_path = Path(self.SETTINGS_FILE)
             if settings_path.exists():
-                with open(settings_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(settings_path, 'rb') as f:
+                    return _jloads(f.read())
         except Exception as e:
             print(f"Ошибка загрузки настроек: {e}")
         return {"theme": "dark", "show_game_size": False}
-    
-    def save_settings(self):
+
+    def _write_settings_sync(self):
         try:
             settings_path = Path(self.SETTINGS_FILE)
             settings_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(settings_path, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2)
+            with open(settings_path, 'wb') as f:
+                f.write(_jdumpb(self.settings, indent=True))
         except Exception as e:
             print(f"Ошибка сохранения настроек: {e}")
 
+    def save_settings(self):
+        # Запись уходит в пул потоков: событийный цикл (и UI) не ждёт диск
+        async def _save():
+            await asyncio.to_thread(self._write_settings_sync)
+
+        try:
+            self.page.run_task(_save)
+        except Exception:
+            # Вне событийного цикла (например, при завершении) пишем сразу
+            self._write_settings_sync()
+
+    def save_settings_soon(self, delay: float = 0.4):
+        """Отложенная запись настроек (как save_library_soon в бэкенде).
+
+        on_change текстового поля API-ключа стреляет на каждый символ;
+        серия вызовов в пределах задержки схлопывается в одну
+        сериализацию и одну запись на диск."""
+        if self._save_settings_task and not self._save_settings_task.done():
+            self._save_settings_task.cancel()
+
+        async def _delayed():
+            try:
+                await asyncio.sleep(delay)
+                await asyncio.to_thread(self._write_settings_sync)
+            except asyncio.CancelledError:
+                pass
+
+        try:
+            self._save_settings_task = self.page.run_task(_delayed)
+        except Exception:
+            self._write_settings_sync()
+
     def save_api_key(self, service: str, key: str):
         """Save API key to settings and reinitialize API clients"""
         if "api_keys" not in self.settings:
             self.settings["api_keys"] = {}
 
         self.settings["api_keys"][service] = key
-        self.save_settings()
+        # on_change зовёт нас на каждый введённый символ - пишем на
+        # диск один раз после паузы в наборе
+        self.save_settings_soon()
 
         # Reinitialize API clients in GameManager
         api_keys = self.settings.get("api_keys", {})
@@ -770,10 +930,12 @@ class CyberLauncher:
             if path not in self.settings["excluded_paths"]:
                 self.settings["excluded_paths"].append(path)
             self.save_settings()
-            
+            # Перестраиваем только слот списка исключений в настройках
+            if self._settings_view_cache is not None:
+                self._exclusions_wrap.content = self._build_exclusions_list()
+
             # Remove from card cache
-            if game.uid in self._card_cache:
-                del self._card_cache[game.uid]
+            self._card_cache.pop(game.uid, None)
             
             # Remove from current games list
             self._all_games_list = [g for g in self._all_games_list if g.uid != game.uid]
@@ -784,15 +946,15 @@ class CyberLauncher:
 
 
     def show_snackbar(self, message: str, bgcolor: str = "#333333", duration: int = 4000):
-        """Helper to show snackbar compatible with Flet 0.80+"""
-        snackbar = ft.SnackBar(
-            content=ft.Text(message),
-            bgcolor=bgcolor,
-            duration=duration,
-        )
-        # Add to overlay if not already there
-        self.page.overlay.append(snackbar)
-        snackbar.open = True
+        """Helper to show snackbar compatible with Flet 0.80+
+
+        Переиспользует единственный SnackBar из build_ui: каждое
+        уведомление раньше добавляло в overlay новый контрол, и их
+        список рос до конца сеанса."""
+        self._snack_text.value = message
+        self._snackbar.bgcolor = bgcolor
+        self._snackbar.duration = duration
+        self._snackbar.open = True
         self.page.update()
 
     def _build_exclusions_list(self) -> ft.Container:
@@ -862,8 +1024,10 @@ class CyberLauncher:
                     self.show_snackbar(f"'{game.title}' восстановлена в библиотеку", bgcolor="#4CAF50")
                 else:
                     self.show_snackbar("Убрано из исключений. Появится при сканировании.", bgcolor="#4CAF50")
-                
-                # Refresh settings view to update the list
+
+                # Refresh only the exclusions slot of the settings view
+                if self._settings_view_cache is not None:
+                    self._exclusions_wrap.content = self._build_exclusions_list()
                 self.show_settings_view()
                 # Update main grid in background (if settings is closed)
                 # self.update_game_grid(reset_page=False)
@@ -915,14 +1079,14 @@ class CyberLauncher:
             )
         )
         
-        # Sidebar buttons
-        self.sidebar_buttons["all"] = SidebarButton(ft.Icons.GRID_VIEW_ROUNDED, "Все игры", is_active=True, on_click=self.on_filter_click, data="all")
-        self.sidebar_buttons["favorites"] = SidebarButton(ft.Icons.FAVORITE_BORDER, "Избранное", on_click=self.on_filter_click, data="favorites")
-        self.sidebar_buttons["steam"] = SidebarButton(ft.Icons.VIDEOGAME_ASSET_OUTLINED, "Steam", on_click=self.on_filter_click, data="steam")
-        self.sidebar_buttons["epic"] = SidebarButton(ft.Icons.TOKEN_OUTLINED, "Epic Games", on_click=self.on_filter_click, data="epic")
-        self.sidebar_buttons["system"] = SidebarButton(ft.Icons.COMPUTER_OUTLINED, "Системные", on_click=self.on_filter_click, data="system")
-        self.sidebar_buttons["settings"] = SidebarButton(ft.Icons.SETTINGS_OUTLINED, "Настройки", on_click=self.on_filter_click, data="settings")
-        self.sidebar_buttons["disk_info"] = SidebarButton(ft.Icons.STORAGE_OUTLINED, "Диски", on_click=self.on_filter_click, data="disk_info")
+        # Sidebar buttons - декларативный список вместо семи однотипных
+        # строк: новый фильтр добавляется одной записью в _SIDEBAR_SPEC,
+        # а кнопки создаются одним проходом до вставки в дерево
+        self.sidebar_buttons = {
+            key: SidebarButton(icon, label, is_active=active,
+                               on_click=self.on_filter_click, data=key)
+            for key, icon, label, active in _SIDEBAR_SPEC
+        }
 
         # Disk info button visibility depends on settings
         self.disk_info_sidebar_button = ft.Container(
@@ -953,10 +1117,15 @@ class CyberLauncher:
             ink=True,
         )
 
+        # Живой blur - гауссов проход по всей полосе на каждом кадре;
+        # на слабых GPU его можно выключить в настройках
+        sidebar_blur = (ft.Blur(10, 10, ft.BlurTileMode.MIRROR)
+                        if self.settings.get("sidebar_blur", True) else None)
+
         self.sidebar = ft.Container(
             width=240,
             bgcolor=sidebar_color,
-            blur=ft.Blur(10, 10, ft.BlurTileMode.MIRROR),
+            blur=sidebar_blur,
             content=ft.Column(
                 controls=[
                     ft.Row(controls=[
@@ -1072,7 +1241,9 @@ class CyberLauncher:
             padding=ft.Padding(left=20, right=20, top=10, bottom=5),
         )
         
-        # Game grid
+        # Game grid. on_scroll: следующая страница карточек строится,
+        # когда пользователь докрутил почти до конца, - тяжёлые Stack'и
+        # создаются только по мере появления в вьюпорте
         self.game_grid = ft.GridView(
             expand=True,
             runs_count=4,
@@ -1081,6 +1252,8 @@ class CyberLauncher:
             spacing=15,
             run_spacing=15,
             padding=ft.Padding(left=20, right=20, top=10, bottom=20),
+            on_scroll=self._on_grid_scroll,
+            on_scroll_interval=200,
         )
         
         self.games_container = ft.Column(
@@ -1091,16 +1264,22 @@ class CyberLauncher:
         
         self.settings_view = self.build_settings_view()
         self.loading_overlay = LoadingOverlay()
-        
-        theme_colors = GRADIENT_THEMES.get(self.current_theme, GRADIENT_THEMES["dark"])["colors"]
+
+        # Один нативный FilePicker на страницу - диалоги обложек ходят
+        # через него, а не через одноразовые Tk-интерпретаторы
+        self.file_picker = ft.FilePicker(on_result=self.on_file_picked)
+        self.page.overlay.append(self.file_picker)
+
+        # Один SnackBar на страницу: уведомления переиспользуют его,
+        # меняя текст/цвет на месте, а не копят контролы в overlay
+        self._snack_text = ft.Text("")
+        self._snackbar = ft.SnackBar(content=self._snack_text)
+        self.page.overlay.append(self._snackbar)
         
         self.bg_container = ft.Container(
             expand=True,
-            gradient=ft.LinearGradient(
-                begin=ft.Alignment(-1, -1),
-                end=ft.Alignment(1, 1),
-                colors=theme_colors,
-            ),
+            gradient=GRADIENT_THEMES.get(
+                self.current_theme, GRADIENT_THEMES["dark"])["_bg_gradient"],
             content=self.games_container
         )
         
@@ -1119,9 +1298,19 @@ class CyberLauncher:
         )
         
         self.page.add(layout)
-        self.page.run_task(self.load_library)
+        self.page.run_task(self._rebuild_loop)
+        self.page.run_task(self._async_init)
     
     def build_settings_view(self):
+        # Дерево строится один раз и живёт весь сеанс: свитчи и поля
+        # сами источник своих значений, а изменяемые места (подсветка
+        # темы, список исключений) переприсваиваются точечно по ссылкам
+        # _theme_card_refs/_exclusions_wrap без пересборки статики
+        if self._settings_view_cache is not None:
+            return self._settings_view_cache
+
+        self._theme_card_refs = {}
+
         def create_theme_card(theme_id: str, theme_data: dict):
             is_selected = self.current_theme == theme_id
             
@@ -1129,11 +1318,7 @@ class CyberLauncher:
                 width=100,
                 height=70,
                 border_radius=12,
-                gradient=ft.LinearGradient(
-                    begin=ft.Alignment(-1, -1),
-                    end=ft.Alignment(1, 1),
-                    colors=theme_data["preview"],
-                ),
+                gradient=theme_data["_preview_gradient"],
                 border=ft.Border.all(3, ACCENT_BLUE if is_selected else "#333333"),
             )
             
@@ -1157,17 +1342,23 @@ class CyberLauncher:
                 on_click=lambda e, tid=theme_id: self.change_theme(tid),
                 on_hover=lambda e: self.on_theme_card_hover(e),
             )
-            
+
+            # Ссылки на изменяемые листья - change_theme переподсвечивает
+            # выбор без пересборки вкладки
+            self._theme_card_refs[theme_id] = (card, preview, name)
             return card
         
         theme_cards = [create_theme_card(tid, td) for tid, td in GRADIENT_THEMES.items()]
-        
+
         self.custom_paths_column = ft.Column(
             controls=self._get_custom_path_controls(),
             spacing=10
         )
 
-        return ft.Container(
+        # Слот списка исключений: мутаторы меняют только его content
+        self._exclusions_wrap = ft.Container(content=self._build_exclusions_list())
+
+        self._settings_view_cache = ft.Container(
             expand=True,
             padding=40,
             content=ft.Column(
@@ -1236,6 +1427,30 @@ class CyberLauncher:
 
                     ft.Container(height=15),
 
+                    # Переключатель размытия сайдбара
+                    ft.Container(
+                        content=ft.Row(
+                            controls=[
+                                ft.Column(controls=[
+                                    ft.Text("Размытие боковой панели", size=14, color=TEXT_WHITE),
+                                    ft.Text("Эффект стекла; отключите на слабой видеокарте", size=12, color=TEXT_GREY),
+                                ], spacing=2),
+                                ft.Container(expand=True),
+                                ft.Switch(
+                                    value=self.settings.get("sidebar_blur", True),
+                                    active_color=ACCENT_BLUE,
+                                    on_change=lambda e: self.toggle_sidebar_blur(e.control.value),
+                                ),
+                            ],
+                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                        ),
+                        padding=15,
+                        border_radius=10,
+                        bgcolor="#1E1E1E",
+                    ),
+
+                    ft.Container(height=15),
+
                     # Переключатель вкладки дисков
                     ft.Container(
                         content=ft.Row(
@@ -1423,7 +1638,7 @@ class CyberLauncher:
                     ft.Text("Исключённые программы", size=18, weight=ft.FontWeight.BOLD, color=TEXT_WHITE),
                     ft.Text("Программы, скрытые из библиотеки", size=12, color=TEXT_GREY),
                     ft.Container(height=15),
-                    self._build_exclusions_list(),
+                    self._exclusions_wrap,
 
                     ft.Container(height=40),
                     ft.Divider(color="#333333"),
@@ -1441,7 +1656,8 @@ class CyberLauncher:
                 scroll=ft.ScrollMode.AUTO,
             ),
         )
-    
+        return self._settings_view_cache
+
     def on_theme_card_hover(self, e):
         if e.data == "true":
             e.control.scale = 1.05
@@ -1450,13 +1666,21 @@ class CyberLauncher:
         e.control.update()
     
     def toggle_show_game_size(self, value: bool):
+        if value == self._show_size:
+            return
+        self._show_size = value
         self.settings["show_game_size"] = value
         self.save_settings()
+        # Кэшированные карточки собраны со старым флагом - пересоздаём
+        self._card_cache.clear()
         if self.current_filter != "settings":
             self.update_game_grid()
-    
+
     def toggle_animations(self, value: bool):
         """Включить/выключить анимацию плиток"""
+        if value == self._animations_enabled:
+            return
+        self._animations_enabled = value
         self.settings["enable_animations"] = value
         self.save_settings()
         # Очищаем кеш чтобы карточки пересоздались с новой настройкой
@@ -1464,6 +1688,14 @@ class CyberLauncher:
         if self.current_filter != "settings":
             self.update_game_grid()
 
+    def toggle_sidebar_blur(self, value: bool):
+        """Включить/выключить размытие сайдбара (дорогое на слабых GPU)"""
+        self.settings["sidebar_blur"] = value
+        self.save_settings()
+        self.sidebar.blur = (ft.Blur(10, 10, ft.BlurTileMode.MIRROR)
+                             if value else None)
+        self.sidebar.update()
+
     def toggle_show_disk_info(self, value: bool):
         """Включить/выключить вкладку информации о дисках"""
         self.settings["show_disk_info"] = value
@@ -1640,6 +1872,15 @@ class CyberLauncher:
             ),
         )
 
+    def _flush_library(self):
+        """Дописываем отложенное сохранение библиотеки перед выходом,
+        чтобы последние клики по избранному/обложкам не потерялись"""
+        try:
+            if self.game_manager:
+                self.game_manager.flush_pending_save()
+        except Exception:
+            pass
+
     def window_action(self, action: str):
         if action == "close":
             # Сворачиваем в трей вместо закрытия
@@ -1648,6 +1889,7 @@ class CyberLauncher:
                 self.page.update()
             else:
                 # Если трей недоступен - закрываем приложение
+                self._flush_library()
                 release_single_instance_lock()
                 sys.exit(0)
         elif action == "min":
@@ -1659,6 +1901,7 @@ class CyberLauncher:
             self.page.update()
         elif action == "exit":
             # Полный выход (из меню трея)
+            self._flush_library()
             stop_tray_icon()
             release_single_instance_lock()
             sys.exit(0)
@@ -1667,9 +1910,9 @@ class CyberLauncher:
         """Обработчик нажатия кнопки обновления"""
         try:
             # Low-level debug write
-            with open("debug_click.txt", "a", encoding="utf-8") as f:
-                f.write("Button clicked!\n")
-                
+            _debug("Button clicked!")
+
+
             backend_logger.info("UI: Update Library button clicked")
             
             self.show_snackbar("Запуск сканирования...")
@@ -1682,8 +1925,65 @@ class CyberLauncher:
             import traceback
             err = traceback.format_exc()
             backend_logger.error(f"Error in on_refresh_click: {err}")
-            with open("debug_click.txt", "a", encoding="utf-8") as f:
-                f.write(f"Error: {err}\n")
+            _debug(f"Error: {err}", flush=True)
+
+    async def _async_init(self):
+        """Тяжёлая часть инициализации - уже после первого кадра.
+
+        Конструктор GameManager создаёт папки и читает кэши сканеров
+        с диска; выполняем его в пуле потоков под оверлеем и только
+        потом грузим библиотеку.
+        """
+        self.loading_overlay.show("Инициализация...")
+        api_keys = self.settings.get("api_keys", {})
+        self.game_manager = await asyncio.to_thread(
+            GameManager,
+            sgdb_key=api_keys.get("steamgriddb") or None,
+            rawg_key=api_keys.get("rawg") or None,
+        )
+
+        # Готовые колбэки фильтров вместо if/elif-цепочки на каждый
+        # рефреш: enum .value разыменовывается один раз здесь, а не при
+        # каждой перестройке грида
+        gm = self.game_manager
+        self._filter_dispatch = {
+            "all": gm.get_all_games,
+            "favorites": lambda v=Category.FAVORITES.value: gm.get_games_by_category(v),
+            "steam": lambda v=Platform.STEAM.value: gm.get_games_by_platform(v),
+            "epic": lambda v=Platform.EPIC.value: gm.get_games_by_platform(v),
+            "system": lambda v=Platform.SYSTEM.value: gm.get_games_by_platform(v),
+        }
+
+        await self.load_library()
+
+        # Фоновый прогрев обложек: к первому клику 'обновить' обложка
+        # обычно уже в кэше. Не await - грид живёт, пока качается
+        self.page.run_task(self._prefetch_missing_covers)
+
+    async def _prefetch_missing_covers(self):
+        """Тихо дотягивает обложки играм, оставшимся без них после
+        сканирования. Семафор держит не больше 4 параллельных походов
+        к API; найденные обложки встают в грид точечной заменой
+        карточки, сохранение идёт через отложенный save_library_soon"""
+        missing = [g for g in self.game_manager.get_all_games()
+                   if not g.icon_path]
+        if not missing:
+            return
+
+        async def fetch(g):
+            async with self._cover_fetch_sem:
+                new_path, _ = await asyncio.to_thread(
+                    self.game_manager.cover_api_manager.get_cover,
+                    g.title, g.app_id, g.exe_path)
+            if new_path:
+                g.icon_path = new_path
+                self.game_manager.save_library_soon()
+                self._card_cache.pop(g.uid, None)
+                self._thumb_map.update(await asyncio.to_thread(
+                    self.game_manager.thumb_cache.build_all, [new_path]))
+                self._swap_card(g)
+
+        await asyncio.gather(*[fetch(g) for g in missing])
 
     async def load_library(self):
         backend_logger.info("UI: load_library started")
@@ -1701,6 +2001,16 @@ class CyberLauncher:
              await self.game_manager.scan_all_games(excluded_paths=excluded, additional_paths=extra_paths, enabled_launchers=launchers)
              self._all_games_list = list(self.game_manager.get_all_games())
 
+        # Прогреваем кэш очистки названий одним батчем в пуле потоков:
+        # при первом рендере карточки берут готовые строки из lru_cache,
+        # а не гоняют три regex'а каждая на UI-потоке
+        titles = [g.title for g in self._all_games_list]
+        await asyncio.to_thread(lambda: [_clean_title(t) for t in titles])
+
+        # Миниатюры обложек под размер карточки: декод мегабайтных
+        # JPEG'ов уходит из рендерера в фоновый пул, один раз
+        self._thumb_map = await asyncio.to_thread(self.game_manager.build_thumbnails)
+
         # Загружаем коллекции в сайдбар
         self.refresh_collections_sidebar()
         self.update_game_grid()
@@ -1712,7 +2022,9 @@ class CyberLauncher:
         backend_logger.info("UI: refresh_library async task started")
         self.loading_overlay.show("Сканирование игр...")
         self.page.update()  # ВАЖНО: показать оверлей СРАЗУ
-        await asyncio.sleep(0.1) # Give UI time to render
+        # page.update() уже отправил оверлей клиенту; достаточно один
+        # раз уступить событийный цикл, 100мс ожидания не нужны
+        await asyncio.sleep(0)
         async def process():
             self.game_manager.set_progress_callback(self.on_scan_progress)
             excluded = self.settings.get("excluded_paths", [])
@@ -1721,13 +2033,24 @@ class CyberLauncher:
             await self.game_manager.scan_all_games(excluded_paths=excluded, additional_paths=extra_paths, enabled_launchers=launchers)
             self._all_games_list = list(self.game_manager.get_all_games())
         await process() # Call the async process function
+        # hide() обновляет только поддерево оверлея, а полный диф
+        # страницы делает единственный отложенный update из
+        # update_game_grid() - отдельный page.update() здесь был
+        # вторым проходом по всему дереву на один рефреш
         self.loading_overlay.hide()
-        self.page.update()  # Скрыть оверлей
         self.update_game_grid()
     
     def on_scan_progress(self, message: str, current: int, total: int):
+        # Сканер дёргает колбэк на каждую найденную игру; оверлей сам
+        # троттлит свой update(), а полный page.update() тоже держим на
+        # <=30 Гц - иначе тысячи игр дают тысячи дифов всего дерева и
+        # рендерер тормозит сам скан. Финальный тик уходит всегда
         self.loading_overlay.update_progress(message, current, total)
-        self.page.update()  # Обновляем UI для отображения прогресса
+        now = time.monotonic()
+        if current != total and now - self._last_progress_update < 0.033:
+            return
+        self._last_progress_update = now
+        self.page.update()
     
     def update_game_grid(self, reset_page: bool = True):
         """Оптимизированное обновление сетки игр с пагинацией"""
@@ -1735,115 +2058,309 @@ class CyberLauncher:
         if reset_page:
             self._current_page = 0
             
-            # Получаем и сортируем игры один раз
-            if self.current_filter == "all":
-                games = self.game_manager.get_all_games()
-            elif self.current_filter == "favorites":
-                games = self.game_manager.get_games_by_category(Category.FAVORITES.value)
-            elif self.current_filter == "steam":
-                games = self.game_manager.get_games_by_platform(Platform.STEAM.value)
-            elif self.current_filter == "epic":
-                games = self.game_manager.get_games_by_platform(Platform.EPIC.value)
-            elif self.current_filter == "system":
-                games = self.game_manager.get_games_by_platform(Platform.SYSTEM.value)
-            elif self.current_filter.startswith("collection_"):
-                # Фильтр по коллекции
-                collection_id = self.current_filter.replace("collection_", "")
+            # Получаем игры одним вызовом по готовой таблице диспетчеризации
+            if self.current_filter.startswith("collection_"):
+                # Фильтр по коллекции - динамический ключ
+                collection_id = self.current_filter[len("collection_"):]
                 games = self.game_manager.get_games_by_collection(collection_id)
             else:
-                games = self.game_manager.get_all_games()
+                games = self._filter_dispatch.get(
+                    self.current_filter, self.game_manager.get_all_games)()
             
-            self._all_games_list = list(games)
+            base = list(games)
 
-            # Search filtering
+            # Search filtering - нижний регистр названий кэшируется на
+            # моделях, а не пересчитывается на каждый введённый символ
             if hasattr(self, 'search_field') and self.search_field.value:
                 query = self.search_field.value.lower()
-                self._all_games_list = [g for g in self._all_games_list if query in g.title.lower()]
-            
-            # Сортировка
-            if self.current_sort == "name_asc":
-                self._all_games_list.sort(key=lambda g: g.title.lower())
-            elif self.current_sort == "name_desc":
-                self._all_games_list.sort(key=lambda g: g.title.lower(), reverse=True)
-            elif self.current_sort == "date_desc":
-                self._all_games_list.sort(key=lambda g: g.added_date or "", reverse=True)
-            elif self.current_sort == "date_asc":
-                self._all_games_list.sort(key=lambda g: g.added_date or "")
-        
+                base = [g for g in base if query in self._title_lower(g)]
+
+            # Смена выборки (фильтр, поиск, состав библиотеки)
+            # сбрасывает кэш отсортированных представлений
+            base_ids = [g.uid for g in base]
+            if base_ids != self._sorted_base_ids:
+                self._sorted_base_ids = base_ids
+                self._sorted_lists = {"default": base}
+
+            self._all_games_list = self._apply_sort(base)
+
         self._render_visible_cards()
+
+    @staticmethod
+    def _title_lower(g) -> str:
+        """Нижний регистр сырого названия, посчитанный один раз на игру"""
+        k = getattr(g, "_title_lower_key", None)
+        if k is None:
+            k = g.title.lower()
+            g._title_lower_key = k
+        return k
+
+    def _apply_sort(self, base: list) -> list:
+        """Отсортированное представление выборки для текущего режима.
+
+        Ключи сортировки кэшируются на самих моделях, готовые списки -
+        в _sorted_lists по режиму: сортировка каждого режима на одной
+        выборке делается один раз, листание страниц - просто срезы.
+        attrgetter по готовому ключу не гоняет Python-байткод на
+        сравнение (ни лямбд, ни `or ""`), поэтому декорирование
+        кортежами по Шварцу выигрыша здесь уже не даёт."""
+        cached = self._sorted_lists.get(self.current_sort)
+        if cached is not None:
+            return cached
+
+        for g in base:
+            if not hasattr(g, "_sort_title_key"):
+                g._sort_title_key = _clean_title(g.title).casefold()
+                # added_date - ISO-строка, сортируется лексикографически
+                g._sort_date_key = g.added_date or ""
+
+        if self.current_sort == "name_asc":
+            result = sorted(base, key=attrgetter("_sort_title_key"))
+        elif self.current_sort == "name_desc":
+            result = sorted(base, key=attrgetter("_sort_title_key"), reverse=True)
+        elif self.current_sort == "date_desc":
+            result = sorted(base, key=attrgetter("_sort_date_key"), reverse=True)
+        elif self.current_sort == "date_asc":
+            result = sorted(base, key=attrgetter("_sort_date_key"))
+        else:
+            result = base
+
+        self._sorted_lists[self.current_sort] = result
+        return result
     
     def _render_visible_cards(self):
         """Рендерит только видимые карточки с пагинацией - ОПТИМИЗИРОВАНО"""
-        show_size = self.settings.get("show_game_size", False)
-        enable_animations = self.settings.get("enable_animations", False)  # Default OFF for speed
-        
+        show_size = self._show_size
+
         # Количество карточек для отображения
         cards_to_show = (self._current_page + 1) * self._page_size
         visible_games = self._all_games_list[:cards_to_show]
+
+        # Анимации - только на небольших окнах: при 50+ карточках
+        # каждый проход курсора по гриду превращается в шторм колбэков
+        enable_animations = (self._animations_enabled
+                             and len(visible_games) < 50)  # Default OFF for speed
         
         # Build new controls list (faster than modifying in-place)
         new_controls = []
-        
+
+        # Пре-скан папок иконок нужен только если будут новые карточки
+        existing_icons = None
+        if any(g.uid not in self._card_cache for g in visible_games):
+            existing_icons = self._prescan_icons()
+
         for game in visible_games:
-            if game.uid in self._card_cache:
-                card = self._card_cache[game.uid]
-            else:
-                card = GameCard(
-                    game=game,
-                    on_click=self.on_game_click,
-                    on_favorite=self.on_favorite_click,
-                    on_upload=self.show_upload_dialog,
-                    on_exclude=self.exclude_game,
-                    on_collection=self.show_add_to_collection_dialog,
-                    show_size=show_size,
-                    enable_animations=enable_animations
-                )
-                self._card_cache[game.uid] = card
-            
-            new_controls.append(card)
-        
+            new_controls.append(self._get_card(
+                game, show_size, enable_animations, existing_icons))
+
         # Кнопка "Показать ещё" если есть ещё игры
         if cards_to_show < len(self._all_games_list):
-            remaining = len(self._all_games_list) - cards_to_show
-            load_more_btn = ft.Container(
-                content=ft.Column(
-                    controls=[
-                        ft.Icon(ft.Icons.EXPAND_MORE, color=ACCENT_BLUE, size=24),
-                        ft.Text(f"Показать ещё ({remaining})", color=TEXT_WHITE, size=12),
-                    ],
-                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    spacing=5,
-                ),
-                alignment=ft.Alignment(0, 0),
-                bgcolor="#1E1E1E",
-                border_radius=15,
-                border=ft.Border.all(1, "#333333"),
-                on_click=self._load_more_games,
-                ink=True,
-            )
-            new_controls.append(load_more_btn)
-        
+            new_controls.append(self._make_load_more_btn(
+                len(self._all_games_list) - cards_to_show))
+
         # Single assignment instead of clear + append loop
         self.game_grid.controls = new_controls
-        
+        self._card_index = {g.uid: i for i, g in enumerate(visible_games)}
+
+        self._evict_card_cache({g.uid for g in visible_games})
+
+
         total = self.game_manager.games_count
         shown = len(visible_games)
         if self.current_filter == "all":
             self.games_count_text.value = f"{shown}/{total} игр"
         else:
             self.games_count_text.value = f"{shown} из {len(self._all_games_list)}"
-        
-        self.page.update()
 
-    
+        self._schedule_update()
+
+    def _evict_card_cache(self, visible_uids: set):
+        """LRU-вытеснение: карточки вне текущего окна, к которым дольше
+        всего не обращались, уходят первыми"""
+        if len(self._card_cache) <= self._card_cache_limit:
+            return
+        overflow = len(self._card_cache) - self._card_cache_limit
+        for uid in [u for u in self._card_cache
+                    if u not in visible_uids][:overflow]:
+            evicted = self._card_cache.pop(uid)
+            # Рвём ссылку на Stack карточки: поддерево контролов
+            # с DecorationImage собирается GC сразу
+            evicted.content = None
+
+    def _get_card(self, game, show_size, enable_animations, existing_icons):
+        """Карточка из LRU-кэша или новая (с регистрацией в кэше)"""
+        card = self._card_cache.get(game.uid)
+        if card is not None:
+            # LRU: попадание двигает карточку в хвост очереди
+            self._card_cache.move_to_end(game.uid)
+            return card
+        card = GameCard(
+            game=game,
+            on_click=self.on_game_click,
+            on_favorite=self.on_favorite_click,
+            on_upload=self.show_upload_dialog,
+            on_exclude=self.exclude_game,
+            on_collection=self.show_add_to_collection_dialog,
+            show_size=show_size,
+            enable_animations=enable_animations,
+            existing_icons=existing_icons,
+            thumb_map=self._thumb_map
+        )
+        self._card_cache[game.uid] = card
+        return card
+
+    def _swap_card(self, game: GameModel) -> bool:
+        """Точечная пересборка одной карточки на её месте в гриде.
+
+        Диф уходит только по поддереву грида - O(1) вместо пересборки
+        всей видимой страницы. False, если карточки нет на экране
+        (тогда вызывающему нужен полный рендер).
+        """
+        idx = self._card_index.get(game.uid)
+        if idx is None:
+            return False
+        # Тот же порог анимаций, что и у рендера страницы: иначе
+        # пересобранная карточка навсегда теряла ховер, пока соседние
+        # его сохраняли
+        shown = min((self._current_page + 1) * self._page_size,
+                    len(self._all_games_list))
+        enable_animations = self._animations_enabled and shown < 50
+        self.game_grid.controls[idx] = self._get_card(
+            game, self._show_size, enable_animations, self._prescan_icons())
+        self.game_grid.update()
+        return True
+
+    def _make_load_more_btn(self, remaining: int) -> ft.Container:
+        return ft.Container(
+            content=ft.Column(
+                controls=[
+                    ft.Icon(ft.Icons.EXPAND_MORE, color=ACCENT_BLUE, size=24),
+                    ft.Text(f"Показать ещё ({remaining})", color=TEXT_WHITE, size=12),
+                ],
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                spacing=5,
+            ),
+            alignment=ft.Alignment(0, 0),
+            bgcolor="#1E1E1E",
+            border_radius=15,
+            border=ft.Border.all(1, "#333333"),
+            on_click=self._load_more_games,
+            ink=True,
+        )
+
+    def _append_next_page(self):
+        """Инкрементальное дорисовывание следующей страницы.
+
+        В контрол-лист грида добавляются только карточки новой страницы;
+        уже показанные не пересобираются и не переотправляются рендереру,
+        так что цена 'Показать ещё' - O(страница), а не O(всё показанное)."""
+        start = self._current_page * self._page_size
+        end = min(start + self._page_size, len(self._all_games_list))
+        page_games = self._all_games_list[start:end]
+        if not page_games:
+            return
+
+        show_size = self._show_size
+        # Окно уже больше страницы - значит карточек много, ховер глушим
+        enable_animations = self._animations_enabled and end < 50
+
+        existing_icons = None
+        if any(g.uid not in self._card_cache for g in page_games):
+            existing_icons = self._prescan_icons()
+
+        controls = self.game_grid.controls
+        # Последним стоит кнопка "Показать ещё" - убираем перед дозаписью
+        if controls and not isinstance(controls[-1], GameCard):
+            controls.pop()
+        for game in page_games:
+            self._card_index[game.uid] = len(controls)
+            controls.append(self._get_card(
+                game, show_size, enable_animations, existing_icons))
+        if end < len(self._all_games_list):
+            controls.append(self._make_load_more_btn(
+                len(self._all_games_list) - end))
+
+        # Показанное окно остаётся в кэше целиком, лишнее вытесняется
+        self._evict_card_cache({g.uid for g in self._all_games_list[:end]})
+
+        total = self.game_manager.games_count
+        if self.current_filter == "all":
+            self.games_count_text.value = f"{end}/{total} игр"
+        else:
+            self.games_count_text.value = f"{end} из {len(self._all_games_list)}"
+
+        self._schedule_update()
+
+    def _prescan_icons(self) -> set:
+        """Набор существующих файлов иконок: один scandir на папку
+        кэша вместо stat-проверки в каждой карточке"""
+        dirs = {os.path.dirname(g.icon_path)
+                for g in self._all_games_list if g.icon_path}
+        existing = set()
+        for d in dirs:
+            try:
+                with os.scandir(d) as it:
+                    existing.update(e.path for e in it if e.is_file())
+            except OSError:
+                pass
+        return existing
+
+    def _schedule_update(self):
+        """Коалесцирует перерисовки: сколько бы мутаций ни случилось за
+        один тик событийного цикла, рендереру уходит один page.update().
+        Пока первый запрос не обработан, повторные - no-op"""
+        if self._update_pending:
+            return
+        self._update_pending = True
+
+        async def _flush():
+            await asyncio.sleep(0)
+            self._update_pending = False
+            self.page.update()
+
+        self.page.run_task(_flush)
+
     def _load_more_games(self, e):
         """Загружает следующую страницу игр"""
         self._current_page += 1
-        self._render_visible_cards()
+        self._append_next_page()
+
+    def _note_scrolling(self):
+        """Глушит ховер-анимации карточек, пока идёт прокрутка, и
+        снимает флаг через 150мс после последнего события скролла"""
+        global _SCROLLING
+        _SCROLLING = True
+        self._last_scroll = time.monotonic()
+        if self._scroll_reset_pending:
+            return
+        self._scroll_reset_pending = True
+
+        async def _reset():
+            global _SCROLLING
+            while time.monotonic() - self._last_scroll < 0.15:
+                await asyncio.sleep(0.15)
+            _SCROLLING = False
+            self._scroll_reset_pending = False
+
+        self.page.run_task(_reset)
+
+    def _on_grid_scroll(self, e):
+        """Инфинит-скролл: следующая страница строится заранее, когда
+        до конца прокрутки остаётся меньше одного экрана"""
+        self._note_scrolling()
+        try:
+            remaining = e.max_scroll_extent - e.pixels
+        except (AttributeError, TypeError):
+            return
+        if remaining > 600:
+            return
+        if (self._current_page + 1) * self._page_size < len(self._all_games_list):
+            self._current_page += 1
+            self._append_next_page()
     
     def on_filter_click(self, filter_name: str):
         """Оптимизированная обработка переключения вкладок"""
-        if filter_name == self.current_filter:
+        if filter_name == self.current_filter or self.game_manager is None:
             return
 
         # Batch update all buttons without individual updates
@@ -1860,15 +2377,30 @@ class CyberLauncher:
             # Switch content and update once
             self.settings_view = self.build_settings_view()
             self.bg_container.content = self.settings_view
-            self.page.update()  # Single update for everything
+            self._schedule_update()  # Single update for everything
         elif filter_name == "disk_info":
             # Show disk info view
             self.disk_info_view = self.build_disk_info_view()
             self.bg_container.content = self.disk_info_view
-            self.page.update()
+            self._schedule_update()
         else:
             self.bg_container.content = self.games_container
-            self.update_game_grid()  # This already calls page.update()
+            self._rebuild_event.set()
+
+    async def _rebuild_loop(self):
+        """Единственный потребитель запросов на перестройку грида.
+
+        Обработчики фильтров/сортировки только выставляют событие;
+        цикл снимает его, уступает такт догоняющим кликам того же
+        всплеска и делает одну перестройку по актуальному состоянию -
+        промежуточные запросы схлопываются."""
+        while True:
+            await self._rebuild_event.wait()
+            self._rebuild_event.clear()
+            await asyncio.sleep(0)
+            if self.game_manager is None:
+                continue
+            self.update_game_grid()
 
     def _get_custom_path_controls(self):
         return [
@@ -1911,18 +2443,19 @@ class CyberLauncher:
     def show_settings_view(self):
         self.settings_view = self.build_settings_view()
         self.bg_container.content = self.settings_view
-        self.page.update()  # Use page.update for full refresh
-    
+        self._schedule_update()
+
     def show_games_view(self):
         self.bg_container.content = self.games_container
-        self.page.update()  # Use page.update for full refresh
+        self._schedule_update()
 
     
     def set_sort(self, sort_key: str):
         self.current_sort = sort_key
         self.sort_text.value = self.sort_labels.get(sort_key, "Стандартная")
-        self.sort_text.update()
-        self.update_game_grid()
+        # Без отдельного sort_text.update(): перерисовка грида обновит
+        # страницу целиком одним кадром
+        self._rebuild_event.set()
     
     def on_game_click(self, game: GameModel):
         self.page.run_task(self.launch_game, game)
@@ -1941,8 +2474,14 @@ class CyberLauncher:
     async def toggle_favorite(self, game: GameModel):
         await self.game_manager.toggle_favorite(game.uid)
         # Инвалидируем кеш карточки чтобы она пересоздалась с новым состоянием
-        if game.uid in self._card_cache:
-            del self._card_cache[game.uid]
+        self._card_cache.pop(game.uid, None)
+
+        # У звёздочки меняется только сама карточка: состав и порядок
+        # выборки прежние, поэтому достаточно точечной замены
+        if self.current_filter != "favorites" and self._swap_card(game):
+            return
+
+        # В фильтре избранного меняется состав списка - нужен полный рендер.
         # ИСПРАВЛЕНИЕ: Не сбрасываем страницу при изменении избранного
         self.update_game_grid(reset_page=False)
 
@@ -1951,24 +2490,14 @@ class CyberLauncher:
 
     def add_custom_path_click(self, e):
         """Open folder picker to add custom scan path"""
-        def pick_folder_thread():
-            try:
-                root = Tk()
-                root.withdraw()
-                root.attributes('-topmost', True)
-                
-                path = filedialog.askdirectory(
-                    title="Выберите папку с играми"
-                )
-                
-                root.destroy()
-                
-                if path:
-                    self.page.run_task(self._add_custom_path, path)
-            except Exception as ex:
-                print(f"[ERROR] Folder picker error: {ex}")
-        
-        threading.Thread(target=pick_folder_thread, daemon=True).start()
+        async def pick_folder():
+            path = await asyncio.to_thread(
+                _open_tk_dialog, filedialog.askdirectory,
+                title="Выберите папку с играми")
+            if path:
+                await self._add_custom_path(path)
+
+        self.page.run_task(pick_folder)
 
     async def _add_custom_path(self, path: str):
         path = str(Path(path).resolve())
@@ -2008,70 +2537,62 @@ class CyberLauncher:
 
     def show_upload_dialog(self, game: GameModel):
         """Show dialog for manual cover upload"""
-        
-        # Сохраняем игру для которой загружаем обложку
+
+        # Сохраняем игру для которой загружаем обложку - замыкания
+        # диалога работают через эту ссылку, а не через захваченный game
         self.upload_target_game = game
-        self.upload_dialog = None  # Ссылка на диалог для закрытия
+
+        if self.upload_dialog is None:
+            self._build_upload_dialog()
+
+        # Перепривязываем изменяемые части пула: заголовок, поле URL
+        # и градиент текущей темы; статичное дерево не пересобирается
+        self._upload_title.value = f"Обложка: {game.title[:30]}..."
+        self._url_input.value = ""
+        self._upload_body.gradient = GRADIENT_THEMES.get(
+            self.current_theme, GRADIENT_THEMES["dark"])["_bg_gradient"]
+
+        # ИСПРАВЛЕНИЕ: В новых версиях Flet диалоги добавляются через overlay
+        if self.upload_dialog not in self.page.overlay:
+            self.page.overlay.append(self.upload_dialog)
+        self.upload_dialog.open = True
+        logger.debug("Opening upload dialog for: %s", game.title)
+        self.page.update()
+
+    def _build_upload_dialog(self):
+        """Одноразовая сборка дерева диалога загрузки обложки.
+
+        ~20 вложенных контролов строятся один раз на сеанс; замыкания
+        ссылаются на self.upload_target_game, поэтому переоткрытие для
+        другой игры не требует пересборки."""
 
         def on_url_submit(e):
-            url = url_input.value
+            url = self._url_input.value
             if url and url.strip():
-                self.page.run_task(self.upload_cover_from_url, game, url.strip())
+                self.page.run_task(self.upload_cover_from_url,
+                                   self.upload_target_game, url.strip())
                 self.upload_dialog.open = False
                 self.page.update()
 
-        def on_refresh(e):
-            """Force re-download from APIs"""
-            self.page.run_task(self.refresh_cover, game)
-            self.upload_dialog.open = False
-            self.page.update()
-
         def close_dialog(e):
             self.upload_dialog.open = False
             self.page.update()
-        
+
         def on_pick_file_click(e):
-            """Открываем нативный диалог выбора файла через tkinter"""
-            print(f"[DEBUG] Opening file picker for: {game.title}")
+            """Нативный FilePicker flet: без поднятия Tcl/Tk-интерпретатора
+            (десятки МБ RSS и ~100мс) на каждую загрузку обложки"""
+            logger.debug("Opening file picker for: %s",
+                         self.upload_target_game.title)
             self.upload_dialog.open = False  # Закрываем диалог
             self.page.update()
-            
-            # Запускаем tkinter диалог в отдельном потоке чтобы не блокировать UI
-            def pick_file_thread():
-                try:
-                    # Создаём скрытое окно tkinter
-                    root = Tk()
-                    root.withdraw()  # Скрываем главное окно
-                    root.attributes('-topmost', True)  # Поверх всех окон
-                    
-                    file_path = filedialog.askopenfilename(
-                        title="Выберите изображение обложки",
-                        filetypes=[
-                            ("Изображения", "*.jpg *.jpeg *.png *.gif *.webp"),
-                            ("JPEG", "*.jpg *.jpeg"),
-                            ("PNG", "*.png"),
-                            ("GIF", "*.gif"),
-                            ("WebP", "*.webp"),
-                            ("Все файлы", "*.*"),
-                        ]
-                    )
-                    
-                    root.destroy()  # Закрываем tkinter
-                    
-                    if file_path:
-                        print(f"[DEBUG] Local file selected: {file_path}")
-                        # Вызываем загрузку обложки через async task
-                        self.page.run_task(self.upload_cover_from_file, game, file_path)
-                    else:
-                        print("[DEBUG] File picker cancelled")
-                        
-                except Exception as ex:
-                    print(f"[ERROR] File picker error: {ex}")
-            
-            # Запускаем в отдельном потоке
-            threading.Thread(target=pick_file_thread, daemon=True).start()
 
-    
+            # upload_target_game уже выставлен - on_file_picked доведёт
+            self.file_picker.pick_files(
+                dialog_title="Выберите изображение обложки",
+                allowed_extensions=["jpg", "jpeg", "png", "gif", "webp"],
+                allow_multiple=False,
+            )
+
         url_input = ft.TextField(
             label="URL изображения",
             label_style=ft.TextStyle(color=TEXT_GREY),
@@ -2084,32 +2605,15 @@ class CyberLauncher:
             width=400,
             on_submit=on_url_submit,
         )
+        self._url_input = url_input
 
-        # Получаем цвета текущей темы для градиента
-        theme_data = GRADIENT_THEMES.get(self.current_theme, GRADIENT_THEMES["dark"])
-        gradient_colors = theme_data["colors"]
+        self._upload_title = ft.Text("", color=TEXT_WHITE, weight=ft.FontWeight.BOLD)
 
-        self.upload_dialog = ft.AlertDialog(
-            modal=True,
-            bgcolor="transparent",
-            content_padding=0,
-            title=ft.Row(
-                controls=[
-                    ft.Icon(ft.Icons.IMAGE, color=ACCENT_BLUE),
-                    ft.Text(f"Обложка: {game.title[:30]}...", color=TEXT_WHITE, weight=ft.FontWeight.BOLD),
-                ],
-                alignment=ft.MainAxisAlignment.START,
-            ),
-            content=ft.Container(
-                width=480,
-                padding=25,
-                border_radius=15,
-                gradient=ft.LinearGradient(
-                    begin=ft.Alignment(-1, -1),
-                    end=ft.Alignment(1, 1),
-                    colors=gradient_colors,
-                ),
-                content=ft.Column(
+        self._upload_body = ft.Container(
+            width=480,
+            padding=25,
+            border_radius=15,
+            content=ft.Column(
                     controls=[
                         ft.Text("Выберите способ загрузки:", size=14, color=TEXT_GREY),
                         ft.Container(height=10),
@@ -2192,28 +2696,33 @@ class CyberLauncher:
                     ],
                     tight=True,
                     scroll=ft.ScrollMode.AUTO,
-                ),
             ),
+        )
+
+        self.upload_dialog = ft.AlertDialog(
+            modal=True,
+            bgcolor="transparent",
+            content_padding=0,
+            title=ft.Row(
+                controls=[
+                    ft.Icon(ft.Icons.IMAGE, color=ACCENT_BLUE),
+                    self._upload_title,
+                ],
+                alignment=ft.MainAxisAlignment.START,
+            ),
+            content=self._upload_body,
             shape=ft.RoundedRectangleBorder(radius=15),
         )
 
-        # ИСПРАВЛЕНИЕ: В новых версиях Flet диалоги добавляются через overlay
-        if self.upload_dialog not in self.page.overlay:
-            self.page.overlay.append(self.upload_dialog)
-        self.upload_dialog.open = True
-        print(f"[DEBUG] Opening upload dialog for: {game.title}")
-        self.page.update()
-        print(f"[DEBUG] Dialog should be visible now")
-    
     def on_file_picked(self, e: ft.FilePickerResultEvent):
         """Handle local file selection from FilePicker"""
         if e.files and len(e.files) > 0:
             file_path = e.files[0].path
-            print(f"[DEBUG] Local file selected: {file_path}")
+            logger.debug("Local file selected: %s", file_path)
             if self.upload_target_game:
                 self.page.run_task(self.upload_cover_from_file, self.upload_target_game, file_path)
         else:
-            print("[DEBUG] File picker cancelled")
+            logger.debug("File picker cancelled")
 
     async def upload_cover_from_file(self, game: GameModel, file_path: str):
         """Upload cover from local file"""
@@ -2224,17 +2733,22 @@ class CyberLauncher:
 
         if new_path:
             game.icon_path = new_path
-            self.game_manager._games[game.uid] = game
-            await self.game_manager.save_library()
+            # game - та же ссылка, что лежит в _games, повторное
+            # присваивание в словарь ничего не меняло. Сохранение -
+            # через отложенный save_library_soon: серия загрузок
+            # обложек подряд схлопывается в одну запись на диск
+            self.game_manager.save_library_soon()
 
             # Инвалидируем кеш карточки чтобы она пересоздалась с новой обложкой
-            if game.uid in self._card_cache:
-                del self._card_cache[game.uid]
-            # Инвалидируем кеш существования иконки
-            if new_path in GameCard._icon_exists_cache:
-                del GameCard._icon_exists_cache[new_path]
-            GameCard._icon_exists_cache[new_path] = True  # Знаем что файл есть
-            self.update_game_grid(reset_page=False)
+            self._card_cache.pop(game.uid, None)
+            # Перегенерируем миниатюру под новую обложку (тот же путь -
+            # сверка по mtime пересоберёт файл)
+            self._thumb_map.update(await asyncio.to_thread(
+                self.game_manager.thumb_cache.build_all, [new_path]))
+            # Сменилась одна обложка - меняем одну карточку, полный
+            # рендер только если её нет на экране
+            if not self._swap_card(game):
+                self.update_game_grid(reset_page=False)
             
             self.show_snackbar("✅ Обложка загружена успешно!", bgcolor="#4CAF50")
         else:
@@ -2247,9 +2761,9 @@ class CyberLauncher:
         """Обработчик кнопки авто-поиска в диалоге"""
         try:
             # Low-level debug
-            with open("debug_api_click.txt", "a", encoding="utf-8") as f:
-                f.write(f"API Search clicked for {self.upload_target_game.title}\n")
-            
+            _debug(f"API Search clicked for {self.upload_target_game.title}")
+
+
             backend_logger.info(f"UI: API Search clicked for {self.upload_target_game.title}")
             
             # Close dialog first
@@ -2264,8 +2778,7 @@ class CyberLauncher:
             import traceback
             err = traceback.format_exc()
             backend_logger.error(f"Error in on_api_search_click: {err}")
-            with open("debug_api_click.txt", "a", encoding="utf-8") as f:
-                f.write(f"Error: {err}\n")
+            _debug(f"Error in on_api_search_click: {err}", flush=True)
 
     async def upload_cover_from_url(self, game: GameModel, url: str):
         """Upload cover from URL"""
@@ -2276,17 +2789,22 @@ class CyberLauncher:
 
         if new_path:
             game.icon_path = new_path
-            self.game_manager._games[game.uid] = game
-            await self.game_manager.save_library()
+            # game - та же ссылка, что лежит в _games, повторное
+            # присваивание в словарь ничего не меняло. Сохранение -
+            # через отложенный save_library_soon: серия загрузок
+            # обложек подряд схлопывается в одну запись на диск
+            self.game_manager.save_library_soon()
 
             # Инвалидируем кеш карточки
-            if game.uid in self._card_cache:
-                del self._card_cache[game.uid]
-            # Инвалидируем кеш существования иконки
-            if new_path in GameCard._icon_exists_cache:
-                del GameCard._icon_exists_cache[new_path]
-            GameCard._icon_exists_cache[new_path] = True
-            self.update_game_grid(reset_page=False)
+            self._card_cache.pop(game.uid, None)
+            # Перегенерируем миниатюру под новую обложку (тот же путь -
+            # сверка по mtime пересоберёт файл)
+            self._thumb_map.update(await asyncio.to_thread(
+                self.game_manager.thumb_cache.build_all, [new_path]))
+            # Сменилась одна обложка - меняем одну карточку, полный
+            # рендер только если её нет на экране
+            if not self._swap_card(game):
+                self.update_game_grid(reset_page=False)
             
             self.show_snackbar("✅ Обложка загружена успешно!", bgcolor="#4CAF50")
         else:
@@ -2295,47 +2813,68 @@ class CyberLauncher:
         self.loading_overlay.hide()
         self.page.update()
 
-    async def refresh_cover(self, game: GameModel):
-        """Force re-download cover from APIs"""
+    async def refresh_cover(self, game: GameModel, budget: float = 5.0):
+        """Force re-download cover from APIs
+
+        budget - бюджет на сетевые ярусы поиска: интерактивный клик
+        падает быстро в красный снекбар вместо минутной цепочки
+        ретраев. Вызов без бюджета (None) оставляет ретраи - для
+        фоновых путей.
+        """
+        # show() сам шлёт диф своего поддерева - полный page.update()
+        # здесь был вторым проходом по всему дереву контролов
         self.loading_overlay.show("Поиск обложки...")
-        self.page.update()
-        await asyncio.sleep(0.05)  # Give UI time to render
+        await asyncio.sleep(0)  # Отдаём кадр рендереру до блокирующей работы
 
-        # Delete existing cache
+        # Delete existing cache. Удаляем через CoverAPIManager, чтобы
+        # вместе с файлом инвалидировалась запись в снимке индекса
+        # кэша - иначе ярус 1 вернёт путь только что удалённого файла.
+        # unlink - дисковый I/O, держим его вне event loop
         if game.icon_path:
-            try:
-                Path(game.icon_path).unlink()
-            except:
-                pass
+            await asyncio.to_thread(
+                self.game_manager.cover_api_manager.delete_cover,
+                game.icon_path)
 
         # Re-fetch using CoverAPIManager in background thread (non-blocking)
-        new_path, source = await asyncio.to_thread(
-            self.game_manager.cover_api_manager.get_cover,
-            game.title,
-            game.app_id,
-            game.exe_path
-        )
+        async with self._cover_fetch_sem:
+            new_path, source = await asyncio.to_thread(
+                self.game_manager.cover_api_manager.get_cover,
+                game.title,
+                game.app_id,
+                game.exe_path,
+                budget=budget,
+                # Явный клик пользователя идёт мимо отрицательного
+                # кэша: вчерашний провал не повод отвечать мгновенным
+                # 'не найдено' целые сутки
+                force=True
+            )
 
         self.loading_overlay.hide()
 
         if new_path:
             game.icon_path = new_path
-            self.game_manager._games[game.uid] = game
-            await self.game_manager.save_library()
+            # game - та же ссылка, что лежит в _games, повторное
+            # присваивание в словарь ничего не меняло. Сохранение -
+            # через отложенный save_library_soon: серия загрузок
+            # обложек подряд схлопывается в одну запись на диск
+            self.game_manager.save_library_soon()
 
             # Инвалидируем кеш карточки
-            if game.uid in self._card_cache:
-                del self._card_cache[game.uid]
-            # Инвалидируем кеш существования иконки
-            if new_path in GameCard._icon_exists_cache:
-                del GameCard._icon_exists_cache[new_path]
-            GameCard._icon_exists_cache[new_path] = True
-            self.update_game_grid(reset_page=False)
+            self._card_cache.pop(game.uid, None)
+            # Перегенерируем миниатюру под новую обложку (тот же путь -
+            # сверка по mtime пересоберёт файл)
+            self._thumb_map.update(await asyncio.to_thread(
+                self.game_manager.thumb_cache.build_all, [new_path]))
+            # Сменилась одна обложка - меняем одну карточку, полный
+            # рендер только если её нет на экране
+            if not self._swap_card(game):
+                self.update_game_grid(reset_page=False)
 
             # Show source in success message
             self.show_snackbar(f"✅ Обложка найдена! Источник: {source}", bgcolor="#4CAF50")
         else:
-            self.page.update()
+            # show_snackbar завершается page.update() - этого одного
+            # дифа хватает и на спрятанный оверлей
             self.show_snackbar("❌ Не удалось найти обложку", bgcolor="#F44336")
 
     # ========== End Cover Upload Methods ==========
@@ -2644,9 +3183,13 @@ class CyberLauncher:
             self.page.update()
             self.refresh_collections_sidebar()
             # Инвалидируем кеш карточки
-            if game.uid in self._card_cache:
-                del self._card_cache[game.uid]
-            self.update_game_grid(reset_page=False)
+            self._card_cache.pop(game.uid, None)
+            # Менялась одна игра - меняем одну карточку; полный рендер
+            # нужен только при просмотре коллекции (состав списка мог
+            # измениться) или если карточки нет на экране
+            if (self.current_filter.startswith("collection_")
+                    or not self._swap_card(game)):
+                self.update_game_grid(reset_page=False)
 
         # Обрезаем название игры для заголовка
         short_title = game.title[:25] + "..." if len(game.title) > 25 else game.title
@@ -2678,7 +3221,9 @@ class CyberLauncher:
     # ========== End Collections Methods ==========
 
     def change_theme(self, theme_id: str):
-        if theme_id not in GRADIENT_THEMES:
+        # Клик по уже выбранной плитке - частый и полностью холостой:
+        # выходим до записи настроек и переподсветки карточек
+        if theme_id not in GRADIENT_THEMES or theme_id == self.current_theme:
             return
         
         self.current_theme = theme_id
@@ -2687,18 +3232,24 @@ class CyberLauncher:
         
         theme_data = GRADIENT_THEMES[theme_id]
         
-        self.bg_container.gradient = ft.LinearGradient(
-            begin=ft.Alignment(-1, -1),
-            end=ft.Alignment(1, 1),
-            colors=theme_data["colors"],
-        )
+        self.bg_container.gradient = theme_data["_bg_gradient"]
         
         self.sidebar.bgcolor = theme_data.get("sidebar", "#801A1A1A")
-        self.sidebar.update()
-        
-        self.settings_view = self.build_settings_view()
-        self.bg_container.content = self.settings_view
-        self.bg_container.update()
+
+        # Переподсвечиваем карточки тем по ссылкам - статичная часть
+        # вкладки не пересобирается
+        for tid, (card, preview, name) in self._theme_card_refs.items():
+            sel = tid == theme_id
+            card.bgcolor = "#2A2A2A" if sel else "#1E1E1E"
+            preview.border = ft.Border.all(3, ACCENT_BLUE if sel else "#333333")
+            name.color = ACCENT_BLUE if sel else TEXT_WHITE
+            name.weight = ft.FontWeight.BOLD if sel else ft.FontWeight.NORMAL
+
+        # Вкладка настроек уже на экране (клик по плитке темы возможен
+        # только из неё), а build_settings_view и так отдаёт один
+        # закэшированный экземпляр - переподвешивать content незачем
+        # Сайдбар и контент уходят рендереру одним кадром
+        self._schedule_update()
 
 
 def main(page: ft.Page):